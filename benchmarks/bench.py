@@ -0,0 +1,281 @@
+"""Suite de benchmarks : moteur de chiffrement, construction, livre de code, temps réel.
+
+Chaque cas est mesuré en meilleur temps par opération (ns) sur plusieurs
+répétitions. Les résultats sont écrits en JSON et peuvent être comparés à une
+mesure de référence. Pour que la comparaison ne dépende pas de la vitesse de
+la machine, chaque cas est rapporté au cas étalon (encrypt_char/3r) de la
+même mesure : un cas est en régression si ce rapport dépasse celui de la
+référence de plus du seuil (25 % par défaut).
+
+    python benchmarks/bench.py --sortie resultats.json
+    python benchmarks/bench.py --reference benchmarks/reference.json [--seuil 0.25]
+    python benchmarks/bench.py --filtre encrypt --rapide
+
+Code de sortie 1 s'il y a au moins une régression.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+from core.machineEnigma import MachineEnigma  # noqa: E402
+from core.gabarit import compiler_machine  # noqa: E402
+from core.moteurs import numpy_disponible  # noqa: E402
+from components.incremental import ChiffrementIncremental, SessionHistorique  # noqa: E402
+from configuration.configuration import ALPHABET, ROTORS, load_codebook  # noqa: E402
+from configuration import livre_code  # noqa: E402
+from configuration.livre_code import CHEMIN_LIVRE_CODE  # noqa: E402
+from configuration.livre_code_sqlite import convertir_json  # noqa: E402
+
+# Écart toléré par rapport à la référence (0.25 = 25 % plus lent)
+SEUIL = 0.25
+
+# Cas mesuré à chaque exécution, auquel les autres sont rapportés pour comparer
+ETALON = "encrypt_char/3r"
+
+# Durée visée pour une répétition (s)
+DUREE_REPETITION = 0.05
+
+TAILLES = (16, 256, 4096, 65536)
+NB_ROTORS = (3, 5, 8)
+PLUGBOARD = ["AB", "CD", "EF", "GH", "IJ", "KL", "MN", "OP", "QR", "ST"]
+
+Cas = Tuple[Callable[[], object], int]  # (fonction mesurée, opérations par appel)
+
+
+def _args_machine(nb: int) -> Dict:
+    return {
+        "rotors_names": list(ROTORS)[:nb],
+        "positions": "QEVJZZZM"[:nb],
+        "plug_pairs": PLUGBOARD,
+        "reflector_preset": "B",
+        "ring_settings": list(range(1, nb + 1)),
+    }
+
+
+def _texte(taille: int, graine: int = 0) -> str:
+    rnd = random.Random(graine)
+    return "".join(rnd.choice(ALPHABET) for _ in range(taille))
+
+
+# ---------------- Cas mesurés ----------------
+def cas_encrypt_char(nb: int) -> Cas:
+    machine = MachineEnigma(**_args_machine(nb))
+    lettres = _texte(1000)
+
+    def f():
+        for ch in lettres:
+            machine.encrypt_char(ch)
+    return f, len(lettres)
+
+
+def cas_encrypt(nb: int, taille: int) -> Cas:
+    gabarit = compiler_machine(list(ROTORS)[:nb], list(range(1, nb + 1)), PLUGBOARD, "B")
+    machine = gabarit.machine("QEVJZZZM"[:nb])
+    texte = _texte(taille)
+
+    def f():
+        machine.seek(0)
+        machine.encrypt(texte)
+    return f, taille
+
+
+def cas_construction(nb: int) -> Cas:
+    args = _args_machine(nb)
+    return (lambda: MachineEnigma(**args)), 1
+
+
+def cas_gabarit(nb: int) -> Cas:
+    gabarit = compiler_machine(list(ROTORS)[:nb], list(range(1, nb + 1)), PLUGBOARD, "B")
+    positions = "QEVJZZZM"[:nb]
+    return (lambda: gabarit.machine(positions)), 1
+
+
+def cas_livre_json_premier() -> Cas:
+    date_str = livre_code.charger_livre_code(CHEMIN_LIVRE_CODE).derniere_date
+
+    def f():
+        livre_code.vider_cache()
+        load_codebook(CHEMIN_LIVRE_CODE, date_str)
+    return f, 1
+
+
+def cas_livre_json_cache() -> Cas:
+    date_str = livre_code.charger_livre_code(CHEMIN_LIVRE_CODE).derniere_date
+    return (lambda: load_codebook(CHEMIN_LIVRE_CODE, date_str)), 1
+
+
+def cas_livre_sqlite(dossier: str) -> Cas:
+    db_path = os.path.join(dossier, "livre.db")
+    convertir_json(CHEMIN_LIVRE_CODE, db_path)
+    date_str = livre_code.charger_livre_code(CHEMIN_LIVRE_CODE).derniere_date
+    return (lambda: load_codebook(db_path, date_str)), 1
+
+
+def cas_temps_reel_frappe(taille: int) -> Cas:
+    """Mode classique : une lettre tapée à la fin d'un document de `taille` caractères
+    (logique de update_cipher, sans Tk)."""
+    incremental = ChiffrementIncremental(MachineEnigma(**_args_machine(3)))
+    base = _texte(taille)
+    incremental.mettre_a_jour(base)
+    textes = [base + "A", base]
+
+    def f():
+        for t in textes:
+            incremental.mettre_a_jour(t)
+    return f, len(textes)
+
+
+def cas_temps_reel_edition(taille: int) -> Cas:
+    """Mode classique : modification au milieu d'un document de `taille` caractères."""
+    incremental = ChiffrementIncremental(MachineEnigma(**_args_machine(3)))
+    base = _texte(taille)
+    milieu = taille // 2
+    textes = [base[:milieu] + "A" + base[milieu:], base]
+    incremental.mettre_a_jour(base)
+
+    def f():
+        for t in textes:
+            incremental.mettre_a_jour(t)
+    return f, len(textes)
+
+
+def cas_temps_reel_historique(taille: int) -> Cas:
+    """Mode historique : une frappe puis un retour arrière après `taille` caractères
+    (logique de on_key, sans Tk)."""
+    session = SessionHistorique(MachineEnigma(**_args_machine(3)))
+    for ch in _texte(taille):
+        session.taper(ch)
+
+    def f():
+        session.taper("A")
+        session.effacer()
+    return f, 2
+
+
+def construire_cas(dossier: str) -> Dict[str, Callable[[], Cas]]:
+    """Nom du cas -> fabrique (la préparation n'est pas mesurée)."""
+    cas: Dict[str, Callable[[], Cas]] = {}
+    for nb in NB_ROTORS:
+        cas[f"encrypt_char/{nb}r"] = lambda nb=nb: cas_encrypt_char(nb)
+        for taille in TAILLES:
+            cas[f"encrypt/{nb}r/{taille}"] = lambda nb=nb, taille=taille: cas_encrypt(nb, taille)
+        cas[f"construction/{nb}r"] = lambda nb=nb: cas_construction(nb)
+        cas[f"gabarit.machine/{nb}r"] = lambda nb=nb: cas_gabarit(nb)
+    cas["load_codebook/json/premier"] = cas_livre_json_premier
+    cas["load_codebook/json/cache"] = cas_livre_json_cache
+    cas["load_codebook/sqlite"] = lambda: cas_livre_sqlite(dossier)
+    for taille in (1000, 100000):
+        cas[f"temps_reel/frappe/{taille}"] = lambda taille=taille: cas_temps_reel_frappe(taille)
+        cas[f"temps_reel/edition/{taille}"] = lambda taille=taille: cas_temps_reel_edition(taille)
+        cas[f"temps_reel/historique/{taille}"] = lambda taille=taille: cas_temps_reel_historique(taille)
+    return cas
+
+
+# ---------------- Mesure ----------------
+def mesurer(f: Callable[[], object], operations: int, repetitions: int) -> float:
+    """Meilleur temps par opération (ns) sur `repetitions` répétitions d'environ
+    DUREE_REPETITION secondes chacune."""
+    f()  # échauffement (caches, imports paresseux)
+    debut = time.perf_counter()
+    f()
+    un_appel = max(time.perf_counter() - debut, 1e-7)
+    nombre = max(1, int(DUREE_REPETITION / un_appel))
+
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for _ in range(nombre):
+            f()
+        meilleur = min(meilleur, (time.perf_counter() - debut) / nombre)
+    return meilleur / operations * 1e9
+
+
+def executer(filtre: str | None, repetitions: int) -> Dict:
+    resultats = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        for nom, fabrique in construire_cas(dossier).items():
+            if filtre and filtre not in nom and nom != ETALON:
+                continue
+            f, operations = fabrique()
+            ns = mesurer(f, operations, repetitions)
+            resultats[nom] = {"ns_par_op": round(ns, 1), "operations_par_appel": operations}
+            print(f"{nom:32s} {ns:14.1f} ns/op", flush=True)
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plateforme": platform.platform(),
+            "numpy": numpy_disponible(),
+            "repetitions": repetitions,
+        },
+        "resultats": resultats,
+    }
+
+
+def comparer(mesure: Dict, reference: Dict, seuil: float) -> List[str]:
+    """Affiche, pour chaque cas, son temps rapporté à l'étalon dans la référence et
+    dans la mesure, et renvoie les cas dont ce rapport a augmenté de plus du seuil."""
+    regressions = []
+    etalon_mesure = mesure["resultats"][ETALON]["ns_par_op"]
+    etalon_reference = reference["resultats"][ETALON]["ns_par_op"]
+    numpy_differe = mesure["meta"].get("numpy") != reference["meta"].get("numpy")
+    if numpy_differe:
+        print("NumPy disponible dans une seule des deux mesures : cas encrypt non comparés.")
+    print(f"\n{'cas':32s} {'référence':>10s} {'mesure':>10s} {'rapport':>8s}   (en multiples de {ETALON})")
+    for nom, res in mesure["resultats"].items():
+        ref = reference["resultats"].get(nom)
+        if ref is None or nom == ETALON or (numpy_differe and nom.startswith("encrypt/")):
+            continue
+        relatif_ref = ref["ns_par_op"] / etalon_reference
+        relatif = res["ns_par_op"] / etalon_mesure
+        rapport = relatif / relatif_ref
+        marque = ""
+        if rapport > 1 + seuil:
+            marque = "  RÉGRESSION"
+            regressions.append(nom)
+        elif rapport < 1 - seuil:
+            marque = "  amélioration"
+        print(f"{nom:32s} {relatif_ref:10.3f} {relatif:10.3f} {rapport:8.2f}{marque}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sortie", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--reference", help="Résultats JSON de référence à comparer")
+    parser.add_argument("--seuil", type=float, default=SEUIL,
+                        help="Ralentissement toléré (défaut : %(default)s, soit 25 %%)")
+    parser.add_argument("--filtre", help="Ne mesurer que les cas dont le nom contient ce texte")
+    parser.add_argument("--repetitions", type=int, default=5, help="Répétitions par cas (défaut : %(default)s)")
+    parser.add_argument("--rapide", action="store_true", help="Une seule répétition par cas (mesure plus bruitée, à éviter pour comparer)")
+    args = parser.parse_args()
+
+    mesure = executer(args.filtre, 1 if args.rapide else args.repetitions)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            json.dump(mesure, f, indent=2)
+            f.write("\n")
+
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = json.load(f)
+        regressions = comparer(mesure, reference, args.seuil)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de {args.seuil:.0%} : " + ", ".join(regressions))
+            return 1
+        print(f"\nAucune régression au-delà de {args.seuil:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Budget de temps d'import du chemin CLI (main.main, sans interface graphique).
+
+Lance `python -X importtime -c "import main"` dans un processus neuf (depuis
+src/), plusieurs fois, et garde le meilleur temps cumulé d'import de `main`.
+Échoue (code de sortie 1) si ce temps dépasse le budget ou si un module
+réservé à l'interface graphique (ou NumPy) a été importé.
+
+    python benchmarks/budget_import.py [--budget 80] [--repetitions 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Temps cumulé d'import de `main` toléré (ms)
+BUDGET_MS = 80.0
+
+# Paquets qui ne doivent pas être chargés par le chemin CLI
+INTERDITS = ("tkinter", "_tkinter", "ui", "components", "numpy")
+
+
+def mesurer_import() -> Tuple[float, List[str], List[str]]:
+    """Un import de `main` dans un processus neuf.
+    Renvoie (temps cumulé en ms, modules interdits chargés, 5 plus gros imports)."""
+    code = "import sys, main; print('\\n'.join(sys.modules))"
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC, capture_output=True, text=True, check=True,
+    )
+    interdits = sorted(m for m in res.stdout.split() if m.split(".")[0] in INTERDITS)
+
+    cumul = {}
+    for ligne in res.stderr.splitlines():
+        if not ligne.startswith("import time:") or "|" not in ligne:
+            continue
+        _, cumule, nom = ligne.split("|")
+        if cumule.strip().isdigit():
+            cumul[nom.strip()] = int(cumule) / 1000
+    plus_gros = sorted(((t, n) for n, t in cumul.items() if n != "main"), reverse=True)[:5]
+    return cumul["main"], interdits, [f"{n} {t:.1f} ms" for t, n in plus_gros]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="Budget en ms (défaut : %(default)s)")
+    parser.add_argument("--repetitions", type=int, default=5, help="Nombre de mesures (on garde la meilleure)")
+    args = parser.parse_args()
+
+    mesures = [mesurer_import() for _ in range(args.repetitions)]
+    temps, interdits, plus_gros = min(mesures)
+    print(f"import main : {temps:.1f} ms (budget {args.budget:.0f} ms, meilleur de {args.repetitions})")
+    print("plus gros imports : " + ", ".join(plus_gros))
+
+    ok = True
+    if interdits:
+        print("ÉCHEC : modules de l'interface graphique chargés : " + ", ".join(interdits))
+        ok = False
+    if temps > args.budget:
+        print("ÉCHEC : budget d'import dépassé")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# src/attaque/__init__.py
+from .score import FitnessNgrammes, IndiceCoincidence
+from .recherche import Candidat, chercher_cle
+from .menu import Menu, construire_menu
+from .bombe import Arret, ResultatBombe, lancer_bombe
+from .placement import Placement, decalages_possibles, trouver_placements
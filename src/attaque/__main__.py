@@ -0,0 +1,13 @@
+"""Ligne de commande de l'attaque : python -m attaque {recherche,bombe,placement} ..."""
+import sys
+
+from attaque import bombe, placement, recherche
+
+COMMANDES = {"recherche": recherche.main, "bombe": bombe.main, "placement": placement.main}
+
+if len(sys.argv) < 2 or sys.argv[1] not in COMMANDES:
+    print(f"usage : python -m attaque {{{','.join(COMMANDES)}}} ...", file=sys.stderr)
+    sys.exit(2)
+commande = sys.argv.pop(1)
+sys.argv[0] = f"attaque {commande}"
+COMMANDES[commande]()
@@ -0,0 +1,306 @@
+"""Bombe de Turing-Welchman : retrouver la clé à partir d'un mot probable (crib).
+
+Si S est le plugboard et E_k la permutation rotors + réflecteur à la frappe k,
+une arête clair a -- chiffré b du menu (attaque.menu) impose S(b) = E_k(S(a)).
+La Bombe fait une hypothèse sur S(lettre test) et propage toutes ses
+conséquences, avec le « diagonal board » (S(a) = x entraîne S(x) = a). Une
+position est fausse si toutes les hypothèses sur la lettre test finissent
+allumées ; sinon c'est un arrêt, et l'hypothèse restante donne les paires du
+plugboard qu'elle implique.
+
+Pour chaque ordre de rotors, toutes les positions de départ sont testées
+ensemble, sur des tableaux NumPy :
+- les permutations E de la pile de rotors sont compilées une fois par état
+  (tables par position de core.rotors, réflecteur), puis lues pour chaque arête ;
+- l'état à chaque frappe du menu suit MachineEnigma._step_rotors, double-stepping
+  compris : contrairement à la Bombe d'origine, un pas du rotor du milieu
+  pendant le crib ne fait pas manquer la bonne position ;
+- les positions dont la lettre test est saturée sont retirées au fil de la
+  propagation.
+Les ordres de rotors sont répartis sur un pool de processus.
+
+Les rings sont supposés connus (par défaut tous à A) : avec d'autres rings, la
+bonne position est trouvée au décalage près, et attaque.recherche peut ensuite
+retrouver les rings du message entier. Nécessite NumPy.
+
+    from attaque.bombe import lancer_bombe
+    resultat = lancer_bombe(chiffre, "WETTERVORHERSAGE", decalage=0)
+    for arret in resultat.arrets:
+        print(arret)
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel, seule l'attaque en dépend
+    np = None
+
+from attaque.menu import Menu, construire_menu
+from attaque.recherche import _Pile, _avancer, _executer, _exiger_numpy, _lettres, _nb_workers, _valeurs, ordres_rotors
+from configuration.configuration import ALPHABET
+from core.gabarit import creer_machine
+from core.plugboard import MAX_PAIRES
+from core.reflecteur import Reflecteur
+
+# Nombre de positions de départ testées d'un coup
+TAILLE_BLOC = 1 << 15
+
+# Au-delà de ce nombre d'états (26 ** rotors), les permutations ne sont plus
+# compilées pour tous les états mais seulement pour ceux rencontrés
+TAILLE_TABLE = 26 ** 4
+
+
+@dataclass(frozen=True)
+class Arret:
+    """Position où la Bombe s'arrête, avec les paires du plugboard impliquées."""
+
+    rotors: Tuple[str, ...]
+    positions: str
+    rings: str
+    plugboard: Tuple[str, ...]
+
+    def machine(self, reflector_preset: str = "B"):
+        """MachineEnigma à cette clé (plugboard partiel : seulement les paires impliquées)."""
+        return creer_machine(list(self.rotors), self.positions, list(self.plugboard), reflector_preset, self.rings)
+
+    def __str__(self) -> str:
+        return (f"rotors={'-'.join(self.rotors)}  positions={self.positions}  rings={self.rings}  "
+                f"plugboard={' '.join(self.plugboard) or '-'}")
+
+
+@dataclass
+class ResultatBombe:
+    arrets: List[Arret] = field(default_factory=list)
+    positions_testees: int = 0
+    secondes: float = 0.0
+
+    @property
+    def positions_par_seconde(self) -> float:
+        return self.positions_testees / max(self.secondes, 1e-9)
+
+
+Progression = Callable[[int, int, int], None]
+
+
+# ---------------- Propagation ----------------
+def _propager(fils: "np.ndarray", perms: List["np.ndarray"], aretes: List[Tuple[int, int]], test: int):
+    """Propage les hypothèses allumées dans `fils` (lettre, position, valeur de S)
+    jusqu'au point fixe. perms[e] : permutation (positions, 26) de l'arête e.
+    Les positions dont la lettre test est entièrement allumée sont abandonnées en
+    route. Renvoie (fils, index des positions gardées)."""
+    nb = fils.shape[1]
+    gardees = np.arange(nb)
+    plats = [(p.astype(np.intp) + np.arange(nb, dtype=np.intp)[:, None] * 26).ravel() for p in perms]
+    total = -1
+    while True:
+        for (a, b), plat in zip(aretes, plats):
+            # S(b) = E(S(a)) et, E étant une involution, S(a) = E(S(b))
+            fils[b] |= fils[a].ravel()[plat].reshape(-1, 26)
+            fils[a] |= fils[b].ravel()[plat].reshape(-1, 26)
+        fils |= fils.transpose(2, 1, 0)  # diagonal board
+
+        satures = fils[test].all(axis=1)
+        if satures.any():
+            vivantes = ~satures
+            fils = fils[:, vivantes]
+            gardees = gardees[vivantes]
+            perms = [p[vivantes] for p in perms]
+            plats = [(p.astype(np.intp) + np.arange(len(gardees), dtype=np.intp)[:, None] * 26).ravel()
+                     for p in perms]
+        nouveau = int(fils.sum())
+        if nouveau == total or not len(gardees):
+            return fils, gardees
+        total = nouveau
+
+
+def _hypothese(perms: List["np.ndarray"], aretes: List[Tuple[int, int]], test: int, valeur: int):
+    """Paires du plugboard impliquées par S(test) = valeur sur une seule position,
+    ou None si l'hypothèse se contredit."""
+    fils = np.zeros((26, 1, 26), dtype=bool)
+    fils[test, 0, valeur] = True
+    fils, gardees = _propager(fils, perms, aretes, test)
+    if not len(gardees):
+        return None
+    allumes = fils[:, 0, :]
+    if (allumes.sum(axis=1) > 1).any():
+        return None
+    paires = sorted(ALPHABET[a] + ALPHABET[int(v)] for a, v in zip(*np.nonzero(allumes)) if a < v)
+    if len(paires) > MAX_PAIRES:
+        return None
+    return tuple(paires)
+
+
+def _puissance(fonction: "np.ndarray", k: int) -> "np.ndarray":
+    """fonction composée k fois avec elle-même (tableau état -> état), par carrés successifs."""
+    res = np.arange(len(fonction), dtype=np.intp)
+    while k:
+        if k & 1:
+            res = fonction[res]
+        fonction = fonction[fonction]
+        k >>= 1
+    return res
+
+
+# ---------------- Tâches (exécutées dans les workers) ----------------
+# État propre à chaque processus worker
+_menu: Menu | None = None
+_rings = None
+_reflecteur = "B"
+
+
+def _init_worker(menu: Menu, rings: "np.ndarray", reflector_preset: str) -> None:
+    global _menu, _rings, _reflecteur
+    _menu, _rings, _reflecteur = menu, rings, reflector_preset
+
+
+def _tester_ordre(rotors: Tuple[str, ...]) -> Tuple[List[Arret], int]:
+    """Toutes les positions de départ d'un ordre de rotors ; renvoie (arrêts, positions testées)."""
+    pile = _Pile(rotors, [], _reflecteur)
+    n = len(rotors)
+    cibles_rotors = (pile.crans - _rings) % 26
+    aretes = [(a, b) for a, b, _ in _menu.aretes]
+    frappes = [k for _, _, k in _menu.aretes]
+    test = _menu.lettre_test
+    poids = 26 ** np.arange(n - 1, -1, -1, dtype=np.intp)
+
+    total = 26 ** n
+    compilees = total <= TAILLE_TABLE
+    if compilees:
+        # Permutation de chaque état, et état atteint depuis chaque état de départ
+        # à chaque frappe du menu (puissances de la fonction « une frappe »)
+        valeurs = _valeurs(0, total, n)
+        table = pile.permutations(valeurs)
+        o = [valeurs[:, j].copy() for j in range(n)]
+        _avancer(o, [np.full(len(valeurs), c, dtype=np.intp) for c in cibles_rotors])
+        suivant = np.stack(o, axis=1) @ poids
+        apres = {}
+        courant, precedente = np.arange(len(valeurs), dtype=np.intp), 0
+        for k in sorted(set(frappes)):
+            courant = _puissance(suivant, k - precedente)[courant]
+            apres[k], precedente = courant, k
+
+    arrets = []
+    for debut in range(0, total, TAILLE_BLOC):
+        departs = _valeurs(debut, min(debut + TAILLE_BLOC, total), n)
+        nb = len(departs)
+        # Permutation E à la frappe de chaque arête, pour chaque position de départ
+        if compilees:
+            perms = [table[apres[k][debut:debut + nb]] for k in frappes]
+        else:
+            o = [departs[:, j].copy() for j in range(n)]
+            cibles = [np.full(nb, cibles_rotors[j], dtype=np.intp) for j in range(n)]
+            par_frappe = {}
+            for k in range(1, max(frappes) + 1):
+                _avancer(o, cibles)
+                if k in frappes:
+                    par_frappe[k] = pile.permutations(np.stack(o, axis=1))
+            perms = [par_frappe[k] for k in frappes]
+
+        # Hypothèse de départ : la lettre test n'est pas branchée
+        fils = np.zeros((26, nb, 26), dtype=bool)
+        fils[test, :, test] = True
+        fils, gardees = _propager(fils, perms, aretes, test)
+
+        for ligne, i in enumerate(gardees):
+            perms_i = [p[i:i + 1] for p in perms]
+            allumes = fils[test, ligne]
+            # Hypothèse confirmée seule, ou alors la bonne est parmi les éteintes
+            valeurs_test = [test] if allumes.sum() == 1 else np.flatnonzero(~allumes)
+            for valeur in valeurs_test:
+                paires = _hypothese(perms_i, aretes, test, int(valeur))
+                if paires is not None:
+                    arrets.append(Arret(rotors, _lettres((departs[i] + _rings) % 26), _lettres(_rings), paires))
+    return arrets, total
+
+
+# ---------------- Bombe ----------------
+def lancer_bombe(
+    chiffre: str,
+    crib: str,
+    decalage: int = 0,
+    nb_rotors: int = 3,
+    catalogue: Sequence[str] | None = None,
+    reflector_preset: str = "B",
+    ring_settings: Sequence[int] | str | None = None,
+    workers: int | None = None,
+    progression: Progression | None = None,
+) -> ResultatBombe:
+    """Teste toutes les positions de départ de tous les ordres de rotors pour le crib
+    placé à `decalage` (en lettres) dans `chiffre`.
+
+    - ring_settings : rings supposés (liste d'entiers ou lettres), tous à A par défaut ;
+    - workers : processus (par défaut tous les cœurs) ;
+    - progression(ordres_faits, ordres_total, arrets) : appelé après chaque ordre.
+
+    Renvoie les arrêts, le nombre de positions testées et la durée."""
+    _exiger_numpy()
+    menu = construire_menu(chiffre, crib, decalage)
+    ordres = ordres_rotors(nb_rotors, catalogue)
+    workers = _nb_workers(workers)
+    Reflecteur(preset=reflector_preset)
+    if ring_settings is None:
+        ring_settings = [0] * nb_rotors
+    elif isinstance(ring_settings, str):
+        ring_settings = [ALPHABET.index(c) for c in ring_settings.strip().upper()]
+    if len(ring_settings) != nb_rotors:
+        raise ValueError("ring_settings doit avoir une valeur par rotor.")
+    rings = np.array([r % 26 for r in ring_settings], dtype=np.intp)
+
+    resultat = ResultatBombe()
+    faits = [0]
+
+    def rappel(res: Tuple[List[Arret], int]) -> None:
+        arrets, testees = res
+        resultat.arrets.extend(arrets)
+        resultat.positions_testees += testees
+        faits[0] += 1
+        if progression is not None:
+            progression(faits[0], len(ordres), len(resultat.arrets))
+
+    debut = time.perf_counter()
+    _executer(_tester_ordre, ordres, workers, _init_worker, (menu, rings, reflector_preset), rappel)
+    resultat.secondes = time.perf_counter() - debut
+    resultat.arrets.sort(key=lambda a: (a.rotors, a.positions))
+    return resultat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bombe : recherche de clé Enigma à partir d'un mot probable.")
+    parser.add_argument("crib", help="Mot probable (texte clair)")
+    parser.add_argument("chiffre", nargs="?", help="Texte chiffré (entrée standard par défaut)")
+    parser.add_argument("--decalage", type=int, default=0, help="Position du crib dans le texte chiffré, en lettres")
+    parser.add_argument("--rotors", type=int, default=3, help="Nombre de rotors (défaut : %(default)s)")
+    parser.add_argument("--catalogue", help="Rotors à essayer, séparés par des virgules (défaut : tous)")
+    parser.add_argument("--reflecteur", default="B", help="Réflecteur (défaut : %(default)s)")
+    parser.add_argument("--rings", default=None, help="Rings supposés, en lettres (défaut : tous à A)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : tous les cœurs)")
+    args = parser.parse_args()
+
+    chiffre = args.chiffre if args.chiffre is not None else sys.stdin.read()
+    menu = construire_menu(chiffre, args.crib, args.decalage)
+    print(f"Menu : {menu}", file=sys.stderr)
+
+    def afficher(faits: int, total: int, arrets: int) -> None:
+        print(f"\r{faits}/{total} ordres, {arrets} arrêts", end="", file=sys.stderr, flush=True)
+
+    resultat = lancer_bombe(
+        chiffre, args.crib, args.decalage,
+        nb_rotors=args.rotors,
+        catalogue=args.catalogue.split(",") if args.catalogue else None,
+        reflector_preset=args.reflecteur,
+        ring_settings=args.rings,
+        workers=args.workers,
+        progression=afficher,
+    )
+    print(f"\n{resultat.positions_testees} positions en {resultat.secondes:.1f} s "
+          f"({resultat.positions_par_seconde:.0f} positions/s)", file=sys.stderr)
+    for arret in resultat.arrets:
+        print(arret)
+
+
+if __name__ == "__main__":
+    main()
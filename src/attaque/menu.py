@@ -0,0 +1,82 @@
+"""Menu d'un mot probable (crib) : le graphe des couples lettre claire / lettre chiffrée.
+
+Placé à un décalage donné dans le texte chiffré, le crib relie chaque lettre
+claire à la lettre chiffrée correspondante, avec le numéro de frappe :
+crib[i] -- chiffre[decalage + i] à la frappe decalage + i + 1. Les boucles du
+graphe sont ce qui permet à la Bombe d'éliminer les positions fausses : plus
+un menu a de boucles (et d'arêtes), moins il produit d'arrêts parasites.
+
+Une lettre n'est jamais chiffrée en elle-même : un placement où crib[i] ==
+chiffre[decalage + i] est impossible.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from configuration.configuration import ALPHABET
+from utils.formatage import only_letters
+
+Arete = Tuple[int, int, int]  # (lettre claire, lettre chiffrée, frappe), lettres en index 0..25
+
+
+@dataclass
+class Menu:
+    """Graphe d'un crib placé à `decalage` dans le texte chiffré."""
+
+    crib: str
+    decalage: int
+    aretes: List[Arete]
+    lettres: List[int] = field(init=False)
+    nb_composantes: int = field(init=False)
+    nb_boucles: int = field(init=False)
+    lettre_test: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        degres: Dict[int, int] = {}
+        parent: Dict[int, int] = {}
+
+        def racine(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b, _ in self.aretes:
+            for x in (a, b):
+                degres[x] = degres.get(x, 0) + 1
+                parent.setdefault(x, x)
+            parent[racine(a)] = racine(b)
+
+        self.lettres = sorted(degres)
+        self.nb_composantes = len({racine(x) for x in self.lettres})
+        # Nombre cyclomatique : arêtes en trop par rapport à une forêt couvrante
+        self.nb_boucles = len(self.aretes) - len(self.lettres) + self.nb_composantes
+        # Lettre testée par la Bombe : la plus connectée (la plus petite à égalité)
+        self.lettre_test = max(self.lettres, key=lambda x: (degres[x], -x)) if self.lettres else 0
+
+    @property
+    def qualite(self) -> Tuple[int, int]:
+        """Clé de tri des menus : d'abord le nombre de boucles, puis la longueur."""
+        return self.nb_boucles, len(self.aretes)
+
+    def __str__(self) -> str:
+        liens = " ".join(f"{ALPHABET[a]}{ALPHABET[b]}@{k}" for a, b, k in self.aretes)
+        return f"décalage {self.decalage} : {self.nb_boucles} boucle(s), {len(self.aretes)} arêtes ({liens})"
+
+
+def construire_menu(chiffre: str, crib: str, decalage: int) -> Menu:
+    """Menu du crib placé à `decalage` (en lettres) dans le texte chiffré.
+    ValueError si le crib dépasse du texte ou si une lettre y serait chiffrée en elle-même."""
+    chiffre = only_letters(chiffre)
+    crib = only_letters(crib)
+    if not crib:
+        raise ValueError("Le crib doit contenir au moins une lettre.")
+    if decalage < 0 or decalage + len(crib) > len(chiffre):
+        raise ValueError(f"Le crib ({len(crib)} lettres) ne tient pas au décalage {decalage} "
+                         f"d'un texte de {len(chiffre)} lettres.")
+    aretes = []
+    for i, (clair, ch) in enumerate(zip(crib, chiffre[decalage:])):
+        if clair == ch:
+            raise ValueError(f"Placement impossible au décalage {decalage} : "
+                             f"{clair!r} serait chiffré en lui-même (lettre {i} du crib).")
+        aretes.append((ALPHABET.index(clair), ALPHABET.index(ch), decalage + i + 1))
+    return Menu(crib, decalage, aretes)
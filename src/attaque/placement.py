@@ -0,0 +1,177 @@
+"""Placements possibles d'un mot probable (crib) dans un texte chiffré.
+
+Une lettre n'est jamais chiffrée en elle-même : un décalage où une lettre du
+crib tombe sur la même lettre du texte chiffré est exclu. Tous les décalages
+sont vérifiés d'un coup, une comparaison de tableaux par lettre du crib
+(O(longueur du texte) en mémoire, quel que soit le crib).
+
+Les placements restants sont classés par qualité de menu (attaque.menu) :
+nombre de boucles, puis nombre d'arêtes. Les boucles sont comptées pour tous
+les décalages à la fois, par un union-find vectorisé (une ligne de 26 lettres
+par décalage).
+
+Nécessite NumPy.
+
+    from attaque.placement import trouver_placements
+    for placement in trouver_placements(chiffre, ["WETTERVORHERSAGE", "KEINEBESONDERENEREIGNISSE"])[:10]:
+        print(placement, placement.menu(chiffre))
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel, seule l'attaque en dépend
+    np = None
+
+from attaque.menu import Menu, construire_menu
+from attaque.recherche import _exiger_numpy
+from utils.formatage import only_letters
+
+# Nombre de décalages dont on compte les boucles d'un coup
+TAILLE_BLOC = 1 << 16
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Décalage possible d'un crib, avec la qualité de son menu."""
+
+    crib: str
+    decalage: int
+    nb_boucles: int
+    nb_lettres: int
+
+    @property
+    def longueur(self) -> int:
+        return len(self.crib)
+
+    @property
+    def qualite(self):
+        """Même clé de tri que Menu.qualite : boucles, puis longueur."""
+        return self.nb_boucles, self.longueur
+
+    def menu(self, chiffre: str) -> Menu:
+        return construire_menu(chiffre, self.crib, self.decalage)
+
+    def __str__(self) -> str:
+        return f"{self.crib} @ {self.decalage} : {self.nb_boucles} boucle(s), {self.longueur} arêtes, {self.nb_lettres} lettres"
+
+
+def _indices(texte: str) -> "np.ndarray":
+    return np.frombuffer(only_letters(texte).encode("ascii"), dtype=np.uint8) - 65
+
+
+def _decalages(chiffre: "np.ndarray", crib: "np.ndarray", egal: Dict[int, "np.ndarray"]) -> "np.ndarray":
+    nb = len(chiffre) - len(crib) + 1
+    if nb <= 0:
+        return np.zeros(0, dtype=np.intp)
+    exclus = np.zeros(nb, dtype=bool)
+    for i, lettre in enumerate(crib):
+        lettre = int(lettre)
+        if lettre not in egal:
+            egal[lettre] = chiffre == lettre
+        exclus |= egal[lettre][i:i + nb]
+    return np.flatnonzero(~exclus)
+
+
+def decalages_possibles(chiffre: str, crib: str) -> "np.ndarray":
+    """Décalages (en lettres) où le crib peut se trouver : aucune de ses lettres ne
+    tombe sur la même lettre du texte chiffré."""
+    _exiger_numpy()
+    crib = _indices(crib)
+    if not len(crib):
+        raise ValueError("Le crib doit contenir au moins une lettre.")
+    return _decalages(_indices(chiffre), crib, {})
+
+
+def _boucles(chiffre: "np.ndarray", crib: "np.ndarray", decalages: "np.ndarray"):
+    """(boucles, lettres) du menu à chacun des décalages. Union-find sur les 26 lettres,
+    une ligne par décalage : chaque arête qui relie deux composantes déjà connectées
+    ferme une boucle."""
+    nb = len(decalages)
+    base = np.arange(nb, dtype=np.intp) * 26
+    parents = np.tile(np.arange(26, dtype=np.uint8), nb)
+    presentes = np.zeros(nb * 26, dtype=bool)
+    presentes[(base[:, None] + crib).ravel()] = True
+
+    def racines(x: "np.ndarray") -> "np.ndarray":
+        r = x
+        while True:
+            p = parents[base + r]
+            if not (p != r).any():
+                parents[base + x] = r  # compression du chemin
+                return r
+            r = p
+
+    boucles = np.zeros(nb, dtype=np.intp)
+    for i, a in enumerate(crib):
+        b = chiffre[decalages + i]
+        presentes[base + b] = True
+        ra = racines(np.full(nb, a, dtype=np.uint8))
+        rb = racines(b)
+        boucles += ra == rb
+        parents[base + np.maximum(ra, rb)] = np.minimum(ra, rb)
+    return boucles, presentes.reshape(nb, 26).sum(axis=1)
+
+
+def trouver_placements(
+    chiffre: str,
+    cribs: str | Sequence[str],
+    min_boucles: int = 0,
+    top: int | None = None,
+) -> List[Placement]:
+    """Tous les placements possibles de chaque crib dans `chiffre`, du meilleur menu
+    au moins bon (boucles, puis longueur, puis décalage). On ne garde que les
+    menus d'au moins `min_boucles` boucles, et au plus `top` placements."""
+    _exiger_numpy()
+    if isinstance(cribs, str):
+        cribs = [cribs]
+    lettres = _indices(chiffre)
+    egal: Dict[int, "np.ndarray"] = {}
+
+    textes, morceaux = [], []
+    for numero, crib_txt in enumerate(cribs):
+        crib = _indices(crib_txt)
+        if not len(crib):
+            raise ValueError(f"Le crib {crib_txt!r} ne contient aucune lettre.")
+        textes.append(only_letters(crib_txt))
+        possibles = _decalages(lettres, crib, egal)
+        crib = crib.astype(np.intp)
+        for debut in range(0, len(possibles), TAILLE_BLOC):
+            decalages = possibles[debut:debut + TAILLE_BLOC]
+            boucles, nb_lettres = _boucles(lettres, crib, decalages)
+            gardes = boucles >= min_boucles
+            morceaux.append((np.full(gardes.sum(), numero), decalages[gardes], boucles[gardes], nb_lettres[gardes]))
+
+    if not morceaux:
+        return []
+    numeros, decalages, boucles, nb_lettres = (np.concatenate(m) for m in zip(*morceaux))
+    longueurs = np.array([len(t) for t in textes])[numeros]
+    # Les objets Placement ne sont créés que pour les placements renvoyés
+    ordre = np.lexsort((numeros, decalages, -longueurs, -boucles))
+    if top is not None:
+        ordre = ordre[:top]
+    return [Placement(textes[numeros[i]], int(decalages[i]), int(boucles[i]), int(nb_lettres[i])) for i in ordre]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Placements possibles de mots probables dans un texte chiffré.")
+    parser.add_argument("cribs", nargs="+", help="Mots probables (texte clair)")
+    parser.add_argument("--chiffre", help="Fichier du texte chiffré (entrée standard par défaut)")
+    parser.add_argument("--min-boucles", type=int, default=0, help="Nombre minimal de boucles du menu")
+    parser.add_argument("--top", type=int, default=20, help="Placements affichés (défaut : %(default)s)")
+    args = parser.parse_args()
+
+    if args.chiffre:
+        with open(args.chiffre, "r", encoding="utf-8") as f:
+            chiffre = f.read()
+    else:
+        chiffre = sys.stdin.read()
+    for placement in trouver_placements(chiffre, args.cribs, args.min_boucles, args.top):
+        print(placement)
+
+
+if __name__ == "__main__":
+    main()
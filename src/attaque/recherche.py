@@ -0,0 +1,375 @@
+"""Recherche de clé sur texte chiffré seul : ordre des rotors, positions, rings.
+
+Méthode (Gillogly) :
+1. pour chaque ordre de rotors du catalogue ROTORS, toutes les positions de
+   départ sont essayées avec les rings à zéro, et chaque déchiffrement est noté
+   (indice de coïncidence par défaut, voir attaque.score) ;
+2. pour les meilleurs candidats, on cherche les rings des rotors de droite.
+   Changer le ring d'un rotor en décalant sa position d'autant ne change pas
+   son câblage apparent, seulement l'instant où il fait avancer son voisin :
+   les positions trouvées à l'étape 1 restent valables à ce décalage près.
+
+Le déchiffrement est vectorisé sur tous les candidats d'un bloc : chaque
+frappe applique la règle de MachineEnigma._step_rotors (double-stepping
+compris) à des tableaux de décalages, puis les tables par position des rotors
+(core.rotors._compiler_tables), le plugboard et le réflecteur. Le travail est
+réparti par ordre de rotors sur un pool de processus ; chaque tâche renvoie
+ses meilleurs candidats, fusionnés dans un tas de taille `top`.
+
+Le plugboard n'est pas cherché : il est supposé connu (ou vide). L'indice de
+coïncidence reste exploitable avec un plugboard inconnu sur des messages assez
+longs.
+
+Nécessite NumPy.
+
+    from attaque import chercher_cle
+    for candidat in chercher_cle(chiffre, top=5):
+        print(candidat)
+"""
+import argparse
+import heapq
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel, seule l'attaque en dépend
+    np = None
+
+from attaque.score import FitnessNgrammes, IndiceCoincidence
+from configuration.configuration import ALPHABET, ROTORS
+from core.gabarit import creer_machine
+from core.plugboard import Plugboard
+from core.reflecteur import Reflecteur
+from core.rotors import _compiler_tables
+from utils.formatage import only_letters
+
+# Nombre de candidats déchiffrés d'un coup (borne la mémoire : candidats x frappes octets)
+TAILLE_BLOC = 1 << 14
+
+# Nombre de rotors (en partant de la droite) dont on cherche le ring
+RINGS_CHERCHES = 2
+
+# Candidats gardés par défaut
+TOP = 10
+
+
+@dataclass(frozen=True)
+class Candidat:
+    """Clé candidate et score de son déchiffrement."""
+
+    score: float
+    rotors: Tuple[str, ...]
+    positions: str
+    rings: str
+
+    def machine(self, plug_pairs: Sequence[str] | None = None, reflector_preset: str = "B"):
+        """MachineEnigma à la clé de ce candidat (aux positions de départ)."""
+        return creer_machine(list(self.rotors), self.positions, plug_pairs, reflector_preset, self.rings)
+
+    def __str__(self) -> str:
+        return f"{self.score:.5f}  rotors={'-'.join(self.rotors)}  positions={self.positions}  rings={self.rings}"
+
+
+Progression = Callable[[int, int, Candidat | None], None]
+
+
+def _exiger_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy est requis pour l'attaque (pip install numpy).")
+
+
+# ---------------- Noyau vectorisé ----------------
+class _Pile:
+    """Tables d'un ordre de rotors (ring 0), plugboard et réflecteur, en tableaux."""
+
+    def __init__(self, rotors: Sequence[str], plug_pairs: Sequence[str], reflector_preset: str) -> None:
+        self.rotors = tuple(rotors)
+        self.aller = []
+        self.retour = []
+        for name in rotors:
+            forward, reverse = _compiler_tables(ROTORS[name][0], 0)
+            self.aller.append(np.array(forward, dtype=np.intp).ravel())
+            self.retour.append(np.array(reverse, dtype=np.intp).ravel())
+        self.crans = np.array([ALPHABET.index(ROTORS[name][1]) for name in rotors], dtype=np.intp)
+        self.plug = np.array(Plugboard(plug_pairs).table, dtype=np.intp)
+        self.refl = np.array(Reflecteur(preset=reflector_preset).table, dtype=np.intp)
+
+    def permutations(self, decalages: "np.ndarray") -> "np.ndarray":
+        """Permutation rotors + réflecteur (sans plugboard) à chaque jeu de décalages
+        (candidats, rotors) : tableau (candidats, 26) uint8, une involution par ligne."""
+        nb, n = decalages.shape
+        base = [decalages[:, j].astype(np.intp)[:, None] * 26 for j in range(n)]
+        x = np.broadcast_to(np.arange(26, dtype=np.intp), (nb, 26))
+        for j in range(n - 1, -1, -1):
+            x = self.aller[j][base[j] + x]
+        x = self.refl[x]
+        for j in range(n):
+            x = self.retour[j][base[j] + x]
+        return x.astype(np.uint8)
+
+    def dechiffrer(self, chiffre: "np.ndarray", decalages: "np.ndarray", cibles: "np.ndarray") -> "np.ndarray":
+        """Déchiffre `chiffre` (indices) pour chaque candidat.
+        decalages[c, j] : position - ring du rotor j au départ (l'index des tables ring 0) ;
+        cibles[c, j] : décalage auquel le rotor j est sur son cran (cran - ring).
+        Renvoie un tableau (candidats, frappes) uint8."""
+        nb, n = decalages.shape
+        o = [decalages[:, j].astype(np.intp) for j in range(n)]
+        cibles = [cibles[:, j].astype(np.intp) for j in range(n)]
+        # Rotor rapide : la lettre d'entrée est la même pour tous, une colonne suffit
+        colonnes_rapide = self.aller[-1].reshape(26, 26).T
+        entrees = self.plug[chiffre]
+        out = np.empty((nb, len(chiffre)), dtype=np.uint8)
+        for t in range(len(chiffre)):
+            _avancer(o, cibles)
+            base = [o[j] * 26 for j in range(n)]
+            x = colonnes_rapide[entrees[t]][o[-1]]
+            for j in range(n - 2, -1, -1):
+                x = self.aller[j][base[j] + x]
+            x = self.refl[x]
+            for j in range(n):
+                x = self.retour[j][base[j] + x]
+            out[:, t] = self.plug[x]
+        return out
+
+
+def _avancer(o: List["np.ndarray"], cibles: List["np.ndarray"]) -> None:
+    """Une frappe sur tous les candidats (décalages `o` modifiés sur place) : règle de
+    MachineEnigma._step_rotors, un rotor sur son cran avance avec son voisin de gauche."""
+    n = len(o)
+    sur_cran = [o[j] == cibles[j] for j in range(n)]
+    for j in range(n - 1):
+        o[j] += sur_cran[j] | sur_cran[j + 1]
+        o[j] %= 26
+    o[-1] += 1
+    o[-1] %= 26
+
+
+def _valeurs(debut: int, fin: int, n: int) -> "np.ndarray":
+    """Les n-uplets de 0..25 numérotés de `debut` à `fin` (exclu), rotor de gauche en
+    poids fort (comme get_state). Construits bloc par bloc : les 26**n n-uplets ne
+    tiennent pas en mémoire au-delà de quelques rotors."""
+    etats = np.arange(debut, fin, dtype=np.intp)
+    res = np.empty((len(etats), n), dtype=np.intp)
+    for j in range(n - 1, -1, -1):
+        etats, res[:, j] = np.divmod(etats, 26)
+    return res
+
+
+def _lettres(valeurs) -> str:
+    return "".join(ALPHABET[int(v)] for v in valeurs)
+
+
+def _meilleurs(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """Index des k plus hauts scores."""
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+
+
+def _garder(tas: List, k: int, candidat: Candidat, compteur: int) -> None:
+    """Garde dans `tas` (tas min) les k meilleurs candidats."""
+    element = (candidat.score, compteur, candidat)
+    if len(tas) < k:
+        heapq.heappush(tas, element)
+    elif element[0] > tas[0][0]:
+        heapq.heappushpop(tas, element)
+
+
+# ---------------- Tâches (exécutées dans les workers) ----------------
+# État propre à chaque processus worker
+_chiffre = None
+_score = None
+_plug_pairs: List[str] = []
+_reflecteur = "B"
+
+
+def _init_worker(chiffre: "np.ndarray", score, plug_pairs: List[str], reflector_preset: str) -> None:
+    global _chiffre, _score, _plug_pairs, _reflecteur
+    _chiffre, _score, _plug_pairs, _reflecteur = chiffre, score, plug_pairs, reflector_preset
+
+
+def _chercher_positions(tache: Tuple[Tuple[str, ...], int]) -> List[Candidat]:
+    """Étape 1 : toutes les positions de départ d'un ordre de rotors, rings à zéro."""
+    rotors, k = tache
+    pile = _Pile(rotors, _plug_pairs, _reflecteur)
+    n = len(rotors)
+    tas: List = []
+    total = 26 ** n
+    for debut in range(0, total, TAILLE_BLOC):
+        decalages = _valeurs(debut, min(debut + TAILLE_BLOC, total), n)
+        cibles = np.broadcast_to(pile.crans, decalages.shape)
+        scores = _score(pile.dechiffrer(_chiffre, decalages, cibles))
+        for i in _meilleurs(scores, k):
+            candidat = Candidat(float(scores[i]), rotors, _lettres(decalages[i]), "A" * n)
+            _garder(tas, k, candidat, debut + int(i))
+    return [c for _, _, c in tas]
+
+
+def _chercher_rings(tache: Tuple[Candidat, int, int]) -> List[Candidat]:
+    """Étape 2 : rings des `nb_rings` rotors de droite, à décalages de départ fixés."""
+    depart, nb_rings, k = tache
+    rotors = depart.rotors
+    n = len(rotors)
+    pile = _Pile(rotors, _plug_pairs, _reflecteur)
+    o0 = np.array([ALPHABET.index(c) for c in depart.positions], dtype=np.intp)
+
+    tas: List = []
+    total = 26 ** nb_rings
+    for debut in range(0, total, TAILLE_BLOC):
+        fin = min(debut + TAILLE_BLOC, total)
+        rings = np.zeros((fin - debut, n), dtype=np.intp)
+        rings[:, n - nb_rings:] = _valeurs(debut, fin, nb_rings)
+        decalages = np.broadcast_to(o0, rings.shape)
+        cibles = (pile.crans - rings) % 26
+        scores = _score(pile.dechiffrer(_chiffre, decalages, cibles))
+        for i in _meilleurs(scores, k):
+            candidat = Candidat(float(scores[i]), rotors, _lettres((o0 + rings[i]) % 26), _lettres(rings[i]))
+            _garder(tas, k, candidat, debut + int(i))
+    return [c for _, _, c in tas]
+
+
+# ---------------- Recherche ----------------
+def ordres_rotors(nb_rotors: int, catalogue: Sequence[str] | None = None) -> List[Tuple[str, ...]]:
+    """Tous les ordres de `nb_rotors` rotors distincts pris dans `catalogue` (par défaut ROTORS)."""
+    if catalogue is None:
+        catalogue = list(ROTORS)
+    catalogue = [name.upper() for name in catalogue]
+    for name in catalogue:
+        if name not in ROTORS:
+            raise ValueError(f"Rotor inconnu: {name!r}. Choisir parmi: {', '.join(ROTORS)}")
+    if not 3 <= nb_rotors <= 8 or nb_rotors > len(catalogue):
+        raise ValueError("Le nombre de rotors doit être entre 3 et 8 (et au plus la taille du catalogue).")
+    return list(itertools.permutations(catalogue, nb_rotors))
+
+
+def _nb_workers(workers: int | None) -> int:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers doit être >= 1.")
+    return workers
+
+
+def _executer(fonction, taches, workers: int, initialiser, initargs, rappel) -> None:
+    """Applique `fonction` à chaque tâche (sur `workers` processus, préparés par
+    initialiser(*initargs)) et passe chaque résultat à `rappel`, dans l'ordre d'arrivée."""
+    if workers == 1:
+        initialiser(*initargs)
+        for tache in taches:
+            rappel(fonction(tache))
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initialiser, initargs=initargs) as pool:
+        for futur in as_completed([pool.submit(fonction, t) for t in taches]):
+            rappel(futur.result())
+
+
+def chercher_cle(
+    chiffre: str,
+    nb_rotors: int = 3,
+    catalogue: Sequence[str] | None = None,
+    reflector_preset: str = "B",
+    plug_pairs: Sequence[str] | None = None,
+    score=None,
+    top: int = TOP,
+    rings_cherches: int = RINGS_CHERCHES,
+    workers: int | None = None,
+    progression: Progression | None = None,
+) -> List[Candidat]:
+    """Cherche l'ordre des rotors, les positions et les rings qui déchiffrent le mieux
+    `chiffre`, parmi les rotors de `catalogue` (par défaut tout ROTORS).
+
+    - score : IndiceCoincidence() par défaut, ou FitnessNgrammes ;
+    - top : nombre de candidats gardés à chaque étape et renvoyés ;
+    - rings_cherches : nombre de rotors, depuis la droite, dont on cherche le ring
+      (0 pour s'arrêter à l'étape 1) ;
+    - workers : processus (par défaut tous les cœurs) ;
+    - progression(faites, total, meilleur) : appelé après chaque tâche terminée.
+
+    Renvoie les candidats du meilleur au moins bon score."""
+    _exiger_numpy()
+    ordres = ordres_rotors(nb_rotors, catalogue)
+    if not 0 <= rings_cherches <= nb_rotors:
+        raise ValueError("rings_cherches doit être entre 0 et le nombre de rotors.")
+    if top < 1:
+        raise ValueError("top doit être >= 1.")
+    workers = _nb_workers(workers)
+
+    lettres = only_letters(chiffre)
+    if len(lettres) < 2:
+        raise ValueError("Le texte chiffré doit contenir au moins deux lettres.")
+    indices = np.frombuffer(lettres.encode("ascii"), dtype=np.uint8).astype(np.intp) - 65
+    initargs = (indices, score or IndiceCoincidence(), list(plug_pairs or []), reflector_preset)
+    Plugboard(initargs[2])  # validation avant de lancer les processus
+    Reflecteur(preset=reflector_preset)
+
+    total = len(ordres) + (top if rings_cherches else 0)
+    etat = {"faites": 0, "compteur": 0}
+
+    def fusionner(tas: List) -> Callable[[List[Candidat]], None]:
+        def rappel(candidats: List[Candidat]) -> None:
+            for candidat in candidats:
+                etat["compteur"] += 1
+                _garder(tas, top, candidat, etat["compteur"])
+            etat["faites"] += 1
+            if progression is not None:
+                progression(etat["faites"], total, max(tas)[2] if tas else None)
+        return rappel
+
+    tas_positions: List = []
+    _executer(_chercher_positions, [(o, top) for o in ordres], workers, _init_worker, initargs, fusionner(tas_positions))
+    if not rings_cherches:
+        return [c for _, _, c in sorted(tas_positions, reverse=True)]
+
+    tas_rings: List = []
+    departs = [c for _, _, c in sorted(tas_positions, reverse=True)]
+    total = len(ordres) + len(departs)
+    _executer(_chercher_rings, [(c, rings_cherches, top) for c in departs], workers, _init_worker, initargs, fusionner(tas_rings))
+    return [c for _, _, c in sorted(tas_rings, reverse=True)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recherche de clé Enigma sur texte chiffré seul.")
+    parser.add_argument("chiffre", nargs="?", help="Texte chiffré (entrée standard par défaut)")
+    parser.add_argument("--rotors", type=int, default=3, help="Nombre de rotors (défaut : %(default)s)")
+    parser.add_argument("--catalogue", help="Rotors à essayer, séparés par des virgules (défaut : tous)")
+    parser.add_argument("--reflecteur", default="B", help="Réflecteur (défaut : %(default)s)")
+    parser.add_argument("--plugboard", default="", help="Paires connues, séparées par des espaces")
+    parser.add_argument("--ngrammes", help="Fichier 'NGRAMME COMPTE' : score par n-grammes au lieu de l'IC")
+    parser.add_argument("--top", type=int, default=TOP, help="Candidats affichés (défaut : %(default)s)")
+    parser.add_argument("--rings", type=int, default=RINGS_CHERCHES,
+                        help="Rotors (depuis la droite) dont on cherche le ring (défaut : %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut : tous les cœurs)")
+    args = parser.parse_args()
+
+    chiffre = args.chiffre if args.chiffre is not None else sys.stdin.read()
+
+    def afficher(faites: int, total: int, meilleur: Candidat | None) -> None:
+        print(f"\r{faites}/{total} tâches, meilleur : {meilleur}", end="", file=sys.stderr, flush=True)
+
+    candidats = chercher_cle(
+        chiffre,
+        nb_rotors=args.rotors,
+        catalogue=args.catalogue.split(",") if args.catalogue else None,
+        reflector_preset=args.reflecteur,
+        plug_pairs=args.plugboard.split(),
+        score=FitnessNgrammes.depuis_fichier(args.ngrammes) if args.ngrammes else None,
+        top=args.top,
+        rings_cherches=args.rings,
+        workers=args.workers,
+        progression=afficher,
+    )
+    print(file=sys.stderr)
+    for candidat in candidats:
+        print(candidat)
+    if candidats:
+        meilleur = candidats[0]
+        print(meilleur.machine(args.plugboard.split(), args.reflecteur).encrypt(chiffre, group_5=True))
+
+
+if __name__ == "__main__":
+    main()
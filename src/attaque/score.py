@@ -0,0 +1,110 @@
+"""Scores des déchiffrements candidats (plus haut = plus proche d'un texte clair).
+
+Un score s'applique à un tableau NumPy (candidats, frappes) d'indices de lettres
+(A=0 .. Z=25) et renvoie un score par ligne. Les objets score sont
+sérialisables, pour être envoyés aux processus de recherche.
+
+- IndiceCoincidence : ne demande aucune statistique de langue ; suffit pour
+  trouver l'ordre et les positions des rotors sur un message de quelques
+  centaines de lettres.
+- FitnessNgrammes : somme des log-probabilités des n-grammes du texte, d'après
+  une table construite depuis un fichier de comptes ("NGRAMME COMPTE" par
+  ligne) ou depuis un corpus de texte clair. Plus discriminant, surtout sur
+  les messages courts.
+"""
+import math
+from typing import Dict, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel, seule l'attaque en dépend
+    np = None
+
+from configuration.configuration import ALPHABET
+from utils.formatage import only_letters
+
+
+class IndiceCoincidence:
+    """Indice de coïncidence : probabilité que deux lettres tirées au hasard
+    dans le texte soient identiques (environ 0.038 pour un texte aléatoire,
+    0.066 pour de l'anglais, 0.078 pour du français)."""
+
+    def __call__(self, textes: "np.ndarray") -> "np.ndarray":
+        nb, longueur = textes.shape
+        lignes = np.arange(nb, dtype=np.intp)[:, None] * 26
+        comptes = np.bincount((lignes + textes).ravel(), minlength=nb * 26).reshape(nb, 26)
+        comptes = comptes.astype(np.float64)
+        return (comptes * (comptes - 1)).sum(axis=1) / max(longueur * (longueur - 1), 1)
+
+    def __repr__(self) -> str:
+        return "IndiceCoincidence()"
+
+
+class FitnessNgrammes:
+    """Log-probabilité moyenne des n-grammes du texte."""
+
+    def __init__(self, comptes: Dict[str, int], n: int | None = None) -> None:
+        """comptes : n-gramme (A–Z, tous de même longueur) -> nombre d'occurrences."""
+        if not comptes:
+            raise ValueError("La table de n-grammes est vide.")
+        if n is None:
+            n = len(next(iter(comptes)))
+        if not 1 <= n <= 5:
+            raise ValueError("Les n-grammes doivent faire entre 1 et 5 lettres.")
+        total = 0
+        for ngramme, compte in comptes.items():
+            if len(ngramme) != n or any(c not in ALPHABET for c in ngramme):
+                raise ValueError(f"N-gramme invalide : {ngramme!r} (attendu {n} lettres A–Z).")
+            total += compte
+        if not total:
+            raise ValueError("La table de n-grammes est vide.")
+        self.n = n
+        # Les n-grammes jamais vus comptent comme un dixième d'occurrence
+        plancher = math.log10(0.1 / total)
+        self.table = np.full(26 ** n, plancher, dtype=np.float64)
+        for ngramme, compte in comptes.items():
+            if not compte:
+                continue  # reste au plancher
+            idx = 0
+            for c in ngramme:
+                idx = idx * 26 + ALPHABET.index(c)
+            self.table[idx] = math.log10(compte / total)
+
+    @classmethod
+    def depuis_fichier(cls, chemin: str) -> "FitnessNgrammes":
+        """Table lue dans un fichier texte "NGRAMME COMPTE" (une ligne par n-gramme)."""
+        comptes: Dict[str, int] = {}
+        with open(chemin, "r", encoding="utf-8") as f:
+            for numero, ligne in enumerate(f, 1):
+                champs = ligne.split()
+                if not champs:
+                    continue
+                if len(champs) != 2 or not champs[1].isdigit():
+                    raise ValueError(f"{chemin}, ligne {numero} : attendu 'NGRAMME COMPTE'.")
+                comptes[champs[0].upper()] = comptes.get(champs[0].upper(), 0) + int(champs[1])
+        return cls(comptes)
+
+    @classmethod
+    def depuis_corpus(cls, textes: Iterable[str], n: int = 3) -> "FitnessNgrammes":
+        """Table construite depuis du texte clair (seules les lettres sont gardées)."""
+        comptes: Dict[str, int] = {}
+        for texte in textes:
+            lettres = only_letters(texte)
+            for i in range(len(lettres) - n + 1):
+                ngramme = lettres[i:i + n]
+                comptes[ngramme] = comptes.get(ngramme, 0) + 1
+        return cls(comptes, n)
+
+    def __call__(self, textes: "np.ndarray") -> "np.ndarray":
+        nb, longueur = textes.shape
+        if longueur < self.n:
+            return np.zeros(nb, dtype=np.float64)
+        nb_ngrammes = longueur - self.n + 1
+        idx = np.zeros((nb, nb_ngrammes), dtype=np.intp)
+        for i in range(self.n):
+            idx *= 26
+            idx += textes[:, i:i + nb_ngrammes]
+        return self.table[idx].sum(axis=1) / nb_ngrammes
+
+    def __repr__(self) -> str:
+        return f"FitnessNgrammes(n={self.n})"
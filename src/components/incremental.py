@@ -0,0 +1,236 @@
+"""Logique de chiffrement du mode temps réel, sans Tkinter.
+
+ChiffrementIncremental sert le mode classique (texte éditable) : au lieu de
+rechiffrer tout le document à chaque touche, on garde des points de reprise
+(nombre de lettres avant chaque tranche de INTERVALLE caractères) et on ne
+rechiffre qu'à partir du premier caractère modifié. La machine est replacée
+au bon numéro de frappe par MachineEnigma.seek, en O(nombre de rotors).
+
+SessionHistorique sert le mode historique (saisie en ajout seul) : le texte
+clair est un tampon d'ajout, et une pile d'états compacts des rotors (un tous
+les INTERVALLE caractères) permet d'annuler la dernière frappe en temps
+constant, sans rejouer la session.
+
+ChiffreurEnFond fait tourner un ChiffrementIncremental dans un thread, pour que
+la boucle Tk ne soit jamais bloquée par un long collage : les saisies
+rapprochées sont regroupées (seul le dernier texte compte) et un calcul
+devenu obsolète est interrompu entre deux tranches.
+"""
+import queue
+import re
+import threading
+from typing import Callable, List, Set, Tuple
+
+from core.machineEnigma import MachineEnigma
+from configuration.configuration import ALPHABET
+from utils.nettoyage import est_caractere_autorise
+
+# Un point de reprise tous les INTERVALLE caractères
+INTERVALLE = 256
+
+# Taille des tranches comparées d'un coup pour trouver le premier caractère modifié
+_TRANCHE = 4096
+
+# Taille des tranches chiffrées entre deux vérifications d'annulation
+TRANCHE_CHIFFREMENT = 1 << 14
+
+_SAISIE_SIMPLE = re.compile(r"[A-Za-z \n\r\t]*")
+_BLANCS = str.maketrans("\n\r\t", "   ")
+
+
+def nettoyer_saisie(text: str) -> Tuple[str, Set[str]]:
+    """Nettoie le texte saisi : retours à la ligne / tabulations -> espaces, caractères
+    non autorisés retirés. Renvoie (texte nettoyé, caractères retirés)."""
+    if _SAISIE_SIMPLE.fullmatch(text):
+        return text.translate(_BLANCS), set()
+
+    clean_chars = []
+    invalid = set()
+    for ch in text:
+        if ch in ("\n", "\r", "\t"):
+            clean_chars.append(" ")
+            continue
+        if est_caractere_autorise(ch):
+            clean_chars.append(ch)
+        else:
+            invalid.add(ch)
+    return "".join(clean_chars), invalid
+
+
+def prefixe_commun(a: str, b: str) -> int:
+    """Longueur du plus long préfixe commun (comparaisons par tranches)."""
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i:i + _TRANCHE] == b[i:i + _TRANCHE]:
+        i += _TRANCHE
+    if i >= n:
+        return n
+    # La première différence est dans [i, fin) : dichotomie sur des comparaisons de tranches
+    fin = min(i + _TRANCHE, n)
+    while fin - i > 16:
+        milieu = (i + fin) // 2
+        if a[i:milieu] == b[i:milieu]:
+            i = milieu
+        else:
+            fin = milieu
+    while i < fin and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class ChiffrementIncremental:
+    """Chiffre un texte éditable en ne recalculant que ce qui suit la modification."""
+
+    def __init__(self, machine: MachineEnigma, intervalle: int = INTERVALLE) -> None:
+        self.machine = machine
+        self.intervalle = intervalle
+        self.texte = ""
+        self.chiffre = ""
+        # points[i] = nombre de lettres avant le caractère i * intervalle
+        self.points: List[int] = [0]
+
+    def _lettres_avant(self, index: int) -> int:
+        """Nombre de lettres avant texte[index], à partir du point de reprise le plus proche."""
+        debut = index // self.intervalle * self.intervalle
+        tranche = self.texte[debut:index]
+        return self.points[index // self.intervalle] + len(tranche) - tranche.count(" ")
+
+    def mettre_a_jour(self, texte: str, annule: Callable[[], bool] | None = None) -> Tuple[int, str]:
+        """Prend en compte le nouveau texte (déjà nettoyé : lettres et espaces).
+        Renvoie (index, suite) : le texte chiffré est inchangé avant `index` et vaut
+        `suite` à partir de là.
+        Si `annule` est donné, le chiffrement se fait par tranches et s'arrête dès
+        que annule() est vrai : seul le début traité de `texte` est alors pris en
+        compte (le texte chiffré reste cohérent avec self.texte)."""
+        debut = prefixe_commun(self.texte, texte)
+        if debut == len(self.texte) == len(texte):
+            return debut, ""
+
+        # Frappes déjà faites avant la modification (calculées sur l'ancien texte,
+        # identique au nouveau jusqu'à `debut`)
+        self.machine.seek(self._lettres_avant(debut))
+        if annule is None:
+            fin = len(texte)
+            suite = self.machine.encrypt(texte[debut:], keep_spaces=True)
+        else:
+            fin = debut
+            morceaux = []
+            while fin < len(texte):
+                if morceaux and annule():
+                    break
+                morceaux.append(self.machine.encrypt(texte[fin:fin + TRANCHE_CHIFFREMENT], keep_spaces=True))
+                fin = min(fin + TRANCHE_CHIFFREMENT, len(texte))
+            suite = "".join(morceaux)
+
+        self.texte = texte[:fin]
+        self.chiffre = self.chiffre[:debut] + suite
+
+        # Les points situés au plus tard à `debut` restent valables ; on recalcule les suivants
+        del self.points[debut // self.intervalle + 1:]
+        for i in range(len(self.points), fin // self.intervalle + 1):
+            tranche = self.texte[(i - 1) * self.intervalle:i * self.intervalle]
+            self.points.append(self.points[-1] + len(tranche) - tranche.count(" "))
+        return debut, suite
+
+
+class ChiffreurEnFond:
+    """Chiffrement incrémental dans un thread de fond.
+    soumettre() ne fait que déposer le dernier texte ; les résultats (index, suite),
+    à appliquer dans l'ordre, sont récupérés par resultats_prets() côté Tk."""
+
+    def __init__(self, incremental: ChiffrementIncremental) -> None:
+        self.incremental = incremental
+        self._resultats: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        self._verrou = threading.Lock()
+        self._nouveau = threading.Event()
+        self._texte: str | None = None
+        self._arret = False
+        self._thread = threading.Thread(target=self._boucle, daemon=True)
+        self._thread.start()
+
+    def soumettre(self, texte: str) -> None:
+        """Dépose le texte à chiffrer ; remplace un texte pas encore pris en charge
+        et interrompt le calcul en cours."""
+        with self._verrou:
+            self._texte = texte
+        self._nouveau.set()
+
+    def resultats_prets(self) -> List[Tuple[int, str]]:
+        """Résultats disponibles, sans attendre."""
+        resultats = []
+        while True:
+            try:
+                resultats.append(self._resultats.get_nowait())
+            except queue.Empty:
+                return resultats
+
+    def arreter(self) -> None:
+        self._arret = True
+        self._nouveau.set()
+
+    def _boucle(self) -> None:
+        while True:
+            self._nouveau.wait()
+            with self._verrou:
+                self._nouveau.clear()
+                texte, self._texte = self._texte, None
+            if self._arret:
+                return
+            if texte is None:
+                continue
+            # Un calcul interrompu laisse un état cohérent : le texte suivant repart de là
+            self._resultats.put(self.incremental.mettre_a_jour(texte, annule=self._nouveau.is_set))
+
+
+class SessionHistorique:
+    """Saisie en ajout seul avec retour arrière en O(1)."""
+
+    def __init__(self, machine: MachineEnigma, intervalle: int = INTERVALLE) -> None:
+        self.machine = machine
+        self.intervalle = intervalle
+        self.clair: List[str] = []
+        self.nb_lettres = 0
+        # Pile d'états : (nombre de caractères, nombre de lettres, état compact des rotors),
+        # un tous les `intervalle` caractères
+        self.points: List[Tuple[int, int, int]] = [(0, 0, machine.get_state())]
+
+    def taper(self, ch: str) -> str:
+        """Ajoute un caractère autorisé et renvoie son chiffrement
+        (les caractères hors A–Z sont recopiés sans faire tourner les rotors)."""
+        upper = ch.upper()
+        if upper in ALPHABET:
+            enc = self.machine.encrypt_char(upper)
+            self.nb_lettres += 1
+        else:
+            enc = ch
+
+        self.clair.append(ch)
+        if len(self.clair) % self.intervalle == 0:
+            self.points.append((len(self.clair), self.nb_lettres, self.machine.get_state()))
+        return enc
+
+    def effacer(self) -> bool:
+        """Retire le dernier caractère et remet les rotors dans l'état d'avant sa frappe.
+        Renvoie False s'il n'y avait rien à effacer."""
+        if not self.clair:
+            return False
+        ch = self.clair.pop()
+        if self.points[-1][0] > len(self.clair):
+            self.points.pop()
+        if ch.upper() in ALPHABET:
+            self.nb_lettres -= 1
+            _, lettres, etat = self.points[-1]
+            self.machine.set_state(etat)
+            self.machine.advance(self.nb_lettres - lettres)
+        return True
+
+    def reinitialiser(self) -> None:
+        """Efface toute la saisie et remet les rotors dans leur état de départ."""
+        del self.clair[:]
+        del self.points[1:]
+        self.nb_lettres = 0
+        self.machine.set_state(self.points[0][2])
+
+    @property
+    def texte(self) -> str:
+        return "".join(self.clair)
@@ -1,7 +1,7 @@
 import math 
 
 from ui.ui import show_error, popup_menu, input_dialog, afficher_resultat_avec_complexite
-from core.machineEnigma import MachineEnigma
+from core.gabarit import creer_machine
 from configuration.configEnigma import (demander_rotors,demander_positions, demander_ring_settings,demander_plugboard,demander_nb_rotors_livre,charger_config_livre_code)
 from components.realtime import lancer_mode_temps_reel
 from configuration.configuration import ALPHABET
@@ -253,7 +253,7 @@ class Menu:
         plugboard = config["plugboard"]
 
 
-        machine = MachineEnigma(rotors_names=rotors,positions=positions,ring_settings=ring_settings,plug_pairs=plugboard,reflector_preset="B")
+        machine = creer_machine(rotors_names=rotors,positions=positions,ring_settings=ring_settings,plug_pairs=plugboard,reflector_preset="B")
 
         texte = input_dialog("Message", f"Entrez le message à {mode} :", allow_back=True)
         if texte is None or not texte.strip():
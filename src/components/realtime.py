@@ -1,10 +1,13 @@
 import tkinter as tk
 
 from ui.ui import root, center_window, show_info, show_error, input_dialog, popup_menu
-from core.machineEnigma import MachineEnigma
-from configuration.configuration import ALPHABET
+from core.gabarit import creer_machine
+from components.incremental import ChiffrementIncremental, ChiffreurEnFond, SessionHistorique, nettoyer_saisie
 from utils.nettoyage import est_caractere_autorise
 
+# Intervalle (ms) entre deux lectures des résultats du thread de chiffrement (< 1 image à 60 Hz)
+DELAI_AFFICHAGE_MS = 10
+
 
 """ Entrée : None 
     Sortie : str | None
@@ -160,6 +163,8 @@ def creer_fenetre_mode_reel(rotors, positions, ring_settings, plugboard, secret_
         txt_cipher.config(state="normal")
         txt_cipher.delete("1.0", "end")
         txt_cipher.config(state="disabled")
+        # La logique de chiffrement remet sa machine à l'état de départ
+        txt_plain.event_generate("<<Reinitialiser>>")
 
     btn_reset = tk.Button(button_frame, text="Réinitialiser", command=reset)
     btn_reset.pack(side="left")
@@ -177,7 +182,7 @@ def creer_fenetre_mode_reel(rotors, positions, ring_settings, plugboard, secret_
         plugboard : liste des paires de connexions du plugboard
     Sortie : None
     Connecte la logique de chiffrement temps réel.
-    - stateful=False : mode classique (recalcul complet, texte éditable)
+    - stateful=False : mode classique (texte éditable, rechiffré en fond à partir de la modification)
     - stateful=True  : mode historique (rotors persistants, saisie append-only)
 """
 def connecter_logique_chiffrement(txt_plain: tk.Text,
@@ -190,24 +195,24 @@ def connecter_logique_chiffrement(txt_plain: tk.Text,
                                   lbl_positions=None):
     
     if not stateful:
-        # MODE CLASSIQUE (RECALCUL COMPLET, EDITABLE)
+        # MODE CLASSIQUE (EDITABLE, RECHIFFREMENT A PARTIR DE LA MODIFICATION)
+        # Le chiffrement tourne dans un thread : la boucle Tk ne fait que déposer le texte
+        # et appliquer les résultats
+        fond = ChiffreurEnFond(ChiffrementIncremental(creer_machine(
+            rotors_names=rotors,
+            positions=positions,
+            plug_pairs=plugboard,
+            reflector_preset="B",
+            ring_settings=ring_settings
+        )))
+
         def update_cipher(event=None):
             text = txt_plain.get("1.0", "end-1c")
 
-            clean_chars = []
-            invalid = set()
-            for ch in text:
-                if ch in ("\n", "\r", "\t"):
-                    clean_chars.append(" ")
-                    continue
-                if est_caractere_autorise(ch):
-                    clean_chars.append(ch)
-                else:
-                    invalid.add(ch)
-
+            text, invalid = nettoyer_saisie(text)
             if invalid:
                 txt_plain.delete("1.0", "end")
-                txt_plain.insert("1.0", "".join(clean_chars))
+                txt_plain.insert("1.0", text)
                 chars = " ".join(sorted(repr(c) for c in invalid))
                 show_error(
                     "Caractères non autorisés",
@@ -215,25 +220,25 @@ def connecter_logique_chiffrement(txt_plain: tk.Text,
                     f"{chars}\n\nSeules les lettres A–Z et les espaces sont autorisés."
                 )
 
-            text = "".join(clean_chars)
-
-
-            machine = MachineEnigma(
-                rotors_names=rotors,
-                positions=positions,
-                plug_pairs=plugboard,
-                reflector_preset="B",
-                ring_settings=ring_settings
-            )
-
-            cipher = machine.encrypt(text, keep_spaces=True, group_5=False)
-
-            txt_cipher.config(state="normal")
-            txt_cipher.delete("1.0", "end")
-            txt_cipher.insert("1.0", cipher)
-            txt_cipher.config(state="disabled")
+            fond.soumettre(text)
+
+        def afficher_resultats():
+            if not txt_cipher.winfo_exists():
+                return
+            resultats = fond.resultats_prets()
+            if resultats:
+                # Seule la partie qui suit la première modification est réaffichée
+                txt_cipher.config(state="normal")
+                for debut, suite in resultats:
+                    txt_cipher.delete(f"1.0 + {debut} chars", "end")
+                    txt_cipher.insert("end", suite)
+                txt_cipher.config(state="disabled")
+            txt_cipher.after(DELAI_AFFICHAGE_MS, afficher_resultats)
 
         txt_plain.bind("<KeyRelease>", update_cipher)
+        txt_plain.bind("<<Reinitialiser>>", update_cipher)
+        txt_plain.bind("<Destroy>", lambda event: fond.arreter())
+        afficher_resultats()
         return
 
     # MODE HISTORIQUE (STATEFUL, APPEND-ONLY)
@@ -244,9 +249,8 @@ def connecter_logique_chiffrement(txt_plain: tk.Text,
         "reflector_preset": "B",
         "ring_settings": ring_settings,
     }
-    machine = MachineEnigma(**machine_initial_args)
-
-    internal_plain = ""
+    machine = creer_machine(**machine_initial_args)
+    session = SessionHistorique(machine)
 
     def maj_label_positions():
         """Met à jour le label avec la position actuelle des rotors (lettres)."""
@@ -257,34 +261,18 @@ def connecter_logique_chiffrement(txt_plain: tk.Text,
         )
         lbl_positions.config(text=f"Positions des rotors : {pos_str}")
 
-
-    def recompute_from_scratch():
-        """Recrée la machine et rechiffre tout caractère par caractère."""
-        nonlocal machine
-        machine = MachineEnigma(**machine_initial_args)
-        cipher = []
-        for ch in internal_plain:
-            if ch.upper() in ALPHABET:
-                cipher.append(machine.encrypt_char(ch.upper()))
-            else:
-                cipher.append(ch)
-
-        txt_cipher.config(state="normal")
-        txt_cipher.delete("1.0", "end")
-        txt_cipher.insert("1.0", "".join(cipher))
-        txt_cipher.config(state="disabled")
-
     def on_key(event: tk.Event):
-        nonlocal internal_plain
-
         if event.keysym in ("Left", "Right", "Up", "Down", "Home", "End"):
             return "break"
 
         if event.keysym == "BackSpace":
-            if internal_plain:
-                internal_plain = internal_plain[:-1]
-                txt_plain.delete("end-1c", "end")
-                recompute_from_scratch()
+            # Les rotors reviennent à l'état d'avant la dernière frappe, sans tout rechiffrer
+            if session.effacer():
+                txt_plain.delete("end-2c")
+                txt_cipher.config(state="normal")
+                txt_cipher.delete("end-2c")
+                txt_cipher.config(state="disabled")
+                maj_label_positions()
             return "break"
 
         if event.keysym in ("Return", "Tab"):
@@ -297,16 +285,8 @@ def connecter_logique_chiffrement(txt_plain: tk.Text,
         if not est_caractere_autorise(ch):
             return "break"
 
-        upper = ch.upper()
-
         txt_plain.insert("end", ch)
-        internal_plain += ch
-
-        if upper in ALPHABET:
-            enc = machine.encrypt_char(upper)
-            positions_str = " ".join(chr(ord("A") + r.position) for r in machine.rotors)
-        else:
-            enc = ch
+        enc = session.taper(ch)
 
         txt_cipher.config(state="normal")
         txt_cipher.insert("end", enc)
@@ -320,8 +300,13 @@ def connecter_logique_chiffrement(txt_plain: tk.Text,
 
         return "break"
     
+    def reinitialiser(event=None):
+        session.reinitialiser()
+        maj_label_positions()
+
     maj_label_positions()
     txt_plain.bind("<KeyPress>", on_key)
+    txt_plain.bind("<<Reinitialiser>>", reinitialiser)
 
 """ Entrée : config : dictionnaire de configuration Enigma
     Sortie : None
@@ -1,10 +1,7 @@
 import string
-import os
-import json
-from datetime import date
 
 from ui.ui import show_info,show_error,demander_rotors_gui,demander_positions_gui, demander_rings_gui,input_dialog
-from configuration.configuration import load_codebook
+from configuration.livre_code import charger_livre_code
 
 # -------------------------------------------
 # Fonctions pour demander les configurations MANUELLEMENT
@@ -223,19 +220,9 @@ def charger_config_livre_code(nb_rotors: int | None = None):
     Charge la config du jour depuis data/livre_code.json.
     Si nb_rotors est fourni, on tronque rotors/positions à nb_rotors.
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__)) 
-    codebook_path = os.path.join(base_dir, "data", "livre_code.json")
-
-    with open(codebook_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    today = date.today().isoformat()
-    if today in data:
-        date_str = today
-    else:
-        date_str = sorted(data.keys())[-1]
-
-    entry = load_codebook(codebook_path, date_str)
+    livre = charger_livre_code()
+    date_str = livre.date_du_jour()
+    entry = livre.entree(date_str)
 
     rotors = entry["rotors"]
     positions = entry["positions"]
@@ -1,6 +1,7 @@
-import json
 from typing import Dict, List, Tuple
 
+from configuration.livre_code import charger_livre_code
+
 ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 # Définitions des rotors et réflecteurs
@@ -29,16 +30,11 @@ REFLECTORS: Dict[str, str] = {
 }
 
 
-def load_codebook(json_path: str, date_str: str) -> Dict:
-    """Charge l'entrée complète du livre de code (rotors, positions, plugboard) pour une date."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if date_str not in data:
-        raise KeyError(f"Aucune entrée pour la date {date_str!r} dans {json_path}.")
-    entry = data[date_str]
-    if not isinstance(entry, dict):
-        raise ValueError(f"Entrée invalide pour {date_str!r}.")
-    return entry
+def load_codebook(json_path: str, date_str: str, reseau: str = "") -> Dict:
+    """Charge l'entrée complète du livre de code (rotors, positions, plugboard) pour une date.
+    json_path peut aussi être une base SQLite (.db), qui gère plusieurs réseaux.
+    Le fichier n'est relu que s'il a changé (voir configuration.livre_code)."""
+    return charger_livre_code(json_path).entree(date_str, reseau)
 
 
 def parse_positions(pos3: str) -> List[int]:
@@ -0,0 +1,112 @@
+"""Livre de code : lecture unique et cache par processus.
+
+Le fichier JSON n'est lu et validé qu'une fois ; les appels suivants
+(interface graphique comme ligne de commande) réutilisent les entrées en
+mémoire, tant que la date de modification et la taille du fichier n'ont pas
+changé. La dernière date disponible est calculée au chargement.
+
+Un chemin en .db / .sqlite / .sqlite3 désigne un livre stocké en base SQLite
+(configuration.livre_code_sqlite), qui n'est jamais chargé en entier.
+"""
+import json
+import os
+import time
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from core import instrumentation
+
+if TYPE_CHECKING:  # import circulaire à l'exécution : livre_code_sqlite importe ce module
+    from configuration.livre_code_sqlite import LivreCodeSQLite
+
+# Livre de code fourni avec le projet
+CHEMIN_LIVRE_CODE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "livre_code.json")
+
+# Champs obligatoires d'une entrée
+CHAMPS_ENTREE = ("rotors", "positions", "plugboard")
+
+
+class LivreCode:
+    """Entrées d'un livre de code déjà lu et validé."""
+
+    def __init__(self, json_path: str, data: Dict) -> None:
+        self.json_path = json_path
+        self.entrees: Dict[str, Dict] = {}
+        # Dates dont l'entrée est mal formée : l'erreur n'est levée que si on les demande
+        self.invalides: Dict[str, str] = {}
+        for date_str, entry in data.items():
+            if not isinstance(entry, dict):
+                self.invalides[date_str] = f"Entrée invalide pour {date_str!r}."
+            elif any(champ not in entry for champ in CHAMPS_ENTREE):
+                manquants = ", ".join(c for c in CHAMPS_ENTREE if c not in entry)
+                self.invalides[date_str] = f"Entrée invalide pour {date_str!r} (champs manquants : {manquants})."
+            else:
+                self.entrees[date_str] = entry
+        self.dates: List[str] = sorted(data)
+        self.derniere_date: str | None = self.dates[-1] if self.dates else None
+
+    def __contains__(self, date_str: str) -> bool:
+        return date_str in self.entrees
+
+    def entree(self, date_str: str, reseau: str = "") -> Dict:
+        """Entrée (rotors, positions, rings, plugboard...) pour une date.
+        Renvoie une copie : la modifier n'altère pas le cache.
+        Un livre JSON n'a qu'un réseau (""), voir livre_code_sqlite pour plusieurs."""
+        if reseau:
+            raise KeyError(f"Aucun réseau {reseau!r} dans {self.json_path} (livre JSON sans réseaux).")
+        if date_str in self.invalides:
+            raise ValueError(self.invalides[date_str])
+        if date_str not in self.entrees:
+            raise KeyError(f"Aucune entrée pour la date {date_str!r} dans {self.json_path}.")
+        return dict(self.entrees[date_str])
+
+    def date_du_jour(self, aujourd_hui: str | None = None, reseau: str = "") -> str:
+        """La date du jour si elle est dans le livre, sinon la dernière date disponible."""
+        if reseau:
+            raise KeyError(f"Aucun réseau {reseau!r} dans {self.json_path} (livre JSON sans réseaux).")
+        if aujourd_hui is None:
+            aujourd_hui = date.today().isoformat()
+        if aujourd_hui in self.entrees or aujourd_hui in self.invalides:
+            return aujourd_hui
+        if self.derniere_date is None:
+            raise KeyError(f"Le livre de code {self.json_path} est vide.")
+        return self.derniere_date
+
+
+# Cache par chemin absolu : (signature du fichier, livre lu)
+_CACHE: Dict[str, Tuple[Tuple[int, int], LivreCode]] = {}
+
+
+def charger_livre_code(json_path: str = CHEMIN_LIVRE_CODE) -> "LivreCode | LivreCodeSQLite":
+    """Livre de code de `json_path`, relu seulement si le fichier a changé
+    (date de modification ou taille). Une base SQLite est ouverte sans être chargée."""
+    from configuration.livre_code_sqlite import est_sqlite, ouvrir_livre_code
+
+    if est_sqlite(json_path):
+        return ouvrir_livre_code(json_path)
+
+    chemin = os.path.abspath(json_path)
+    st = os.stat(chemin)
+    signature = (st.st_mtime_ns, st.st_size)
+
+    en_cache = _CACHE.get(chemin)
+    if en_cache is not None and en_cache[0] == signature:
+        if instrumentation.ACTIF:
+            instrumentation.compter("livre_code.cache")
+        return en_cache[1]
+
+    debut = time.perf_counter()
+    with open(chemin, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Livre de code invalide : {json_path} doit contenir un objet JSON.")
+    livre = LivreCode(json_path, data)
+    _CACHE[chemin] = (signature, livre)
+    if instrumentation.ACTIF:
+        instrumentation.ajouter_temps("livre_code.lecture", time.perf_counter() - debut)
+    return livre
+
+
+def vider_cache() -> None:
+    """Oublie tous les livres de code lus."""
+    _CACHE.clear()
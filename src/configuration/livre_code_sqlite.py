@@ -0,0 +1,161 @@
+"""Livre de code stocké dans une base SQLite, pour les listes de clés sur plusieurs années.
+
+Une ligne par (réseau, date), clé primaire sur ce couple : la recherche
+d'une date est en O(log n) sans charger le reste du livre, et les requêtes
+par plage de dates suivent l'index. L'entrée elle-même est gardée en JSON,
+au même format que dans livre_code.json.
+
+Conversion depuis le format JSON :
+    python -m configuration.livre_code_sqlite data/livre_code.json livre.db [--reseau NOM]
+
+load_codebook / charger_livre_code reconnaissent une base SQLite à son
+extension (.db, .sqlite, .sqlite3).
+"""
+import argparse
+import json
+import os
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from configuration.livre_code import CHAMPS_ENTREE
+
+EXTENSIONS_SQLITE = (".db", ".sqlite", ".sqlite3")
+
+# Réseau par défaut (livre de code sans réseau, comme livre_code.json)
+RESEAU_DEFAUT = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entrees (
+    reseau TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    entree TEXT NOT NULL,
+    PRIMARY KEY (reseau, date)
+) WITHOUT ROWID
+"""
+
+
+def est_sqlite(chemin: str) -> bool:
+    return os.path.splitext(chemin)[1].lower() in EXTENSIONS_SQLITE
+
+
+def _valider(date_str: str, entry) -> None:
+    if not isinstance(entry, dict):
+        raise ValueError(f"Entrée invalide pour {date_str!r}.")
+    manquants = [c for c in CHAMPS_ENTREE if c not in entry]
+    if manquants:
+        raise ValueError(f"Entrée invalide pour {date_str!r} (champs manquants : {', '.join(manquants)}).")
+
+
+class LivreCodeSQLite:
+    """Livre de code en lecture seule sur une base SQLite (même interface que LivreCode,
+    avec en plus le réseau et les plages de dates)."""
+
+    def __init__(self, db_path: str) -> None:
+        self.json_path = db_path  # nom gardé pour les messages, comme LivreCode
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __contains__(self, date_str: str) -> bool:
+        return self._ligne(date_str, RESEAU_DEFAUT) is not None
+
+    def _ligne(self, date_str: str, reseau: str):
+        return self._conn.execute(
+            "SELECT entree FROM entrees WHERE reseau = ? AND date = ?", (reseau, date_str)
+        ).fetchone()
+
+    def entree(self, date_str: str, reseau: str = RESEAU_DEFAUT) -> Dict:
+        """Entrée pour une date (et un réseau) ; KeyError si absente."""
+        ligne = self._ligne(date_str, reseau)
+        if ligne is None:
+            reseau_txt = f" (réseau {reseau!r})" if reseau else ""
+            raise KeyError(f"Aucune entrée pour la date {date_str!r}{reseau_txt} dans {self.json_path}.")
+        return json.loads(ligne[0])
+
+    def plage(self, debut: str, fin: str, reseau: str = RESEAU_DEFAUT) -> Iterator[Tuple[str, Dict]]:
+        """(date, entrée) pour toutes les dates de [debut, fin], dans l'ordre."""
+        curseur = self._conn.execute(
+            "SELECT date, entree FROM entrees WHERE reseau = ? AND date BETWEEN ? AND ? ORDER BY date",
+            (reseau, debut, fin),
+        )
+        for date_str, entree in curseur:
+            yield date_str, json.loads(entree)
+
+    def reseaux(self) -> List[str]:
+        return [r for (r,) in self._conn.execute("SELECT DISTINCT reseau FROM entrees ORDER BY reseau")]
+
+    def derniere(self, reseau: str = RESEAU_DEFAUT) -> str | None:
+        """Dernière date disponible pour ce réseau."""
+        return self._conn.execute("SELECT max(date) FROM entrees WHERE reseau = ?", (reseau,)).fetchone()[0]
+
+    @property
+    def derniere_date(self) -> str | None:
+        return self.derniere(RESEAU_DEFAUT)
+
+    def date_du_jour(self, aujourd_hui: str | None = None, reseau: str = RESEAU_DEFAUT) -> str:
+        """La date du jour si elle est dans le livre, sinon la dernière date disponible."""
+        if aujourd_hui is None:
+            aujourd_hui = date.today().isoformat()
+        if self._ligne(aujourd_hui, reseau) is not None:
+            return aujourd_hui
+        derniere = self.derniere(reseau)
+        if derniere is None:
+            raise KeyError(f"Le livre de code {self.json_path} n'a aucune entrée pour le réseau {reseau!r}.")
+        return derniere
+
+
+def convertir_json(json_path: str, db_path: str, reseau: str = RESEAU_DEFAUT) -> int:
+    """Ajoute (ou remplace) dans `db_path` les entrées du livre JSON `json_path`
+    sous le réseau `reseau`. Toutes les entrées sont validées avant écriture.
+    Renvoie le nombre d'entrées écrites."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Livre de code invalide : {json_path} doit contenir un objet JSON.")
+    for date_str, entry in data.items():
+        _valider(date_str, entry)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(_SCHEMA)
+            conn.executemany(
+                "INSERT OR REPLACE INTO entrees (reseau, date, entree) VALUES (?, ?, ?)",
+                ((reseau, d, json.dumps(e, ensure_ascii=False)) for d, e in data.items()),
+            )
+    finally:
+        conn.close()
+    return len(data)
+
+
+# Connexions ouvertes, par chemin absolu
+_OUVERTS: Dict[str, LivreCodeSQLite] = {}
+
+
+def ouvrir_livre_code(db_path: str) -> LivreCodeSQLite:
+    """Livre SQLite de `db_path` (connexion réutilisée d'un appel à l'autre)."""
+    chemin = os.path.abspath(db_path)
+    livre = _OUVERTS.get(chemin)
+    if livre is None:
+        if not os.path.exists(chemin):
+            raise FileNotFoundError(f"Livre de code introuvable : {db_path}")
+        livre = _OUVERTS[chemin] = LivreCodeSQLite(db_path)
+    return livre
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convertit un livre de code JSON en base SQLite.")
+    parser.add_argument("json_path", help="Livre de code au format livre_code.json")
+    parser.add_argument("db_path", help="Base SQLite à créer ou compléter")
+    parser.add_argument("--reseau", default=RESEAU_DEFAUT, help="Réseau sous lequel ranger les entrées")
+    args = parser.parse_args()
+    nb = convertir_json(args.json_path, args.db_path, args.reseau)
+    print(f"{nb} entrées écrites dans {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
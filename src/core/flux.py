@@ -0,0 +1,164 @@
+"""Chiffrement en flux : morceau par morceau, en mémoire constante.
+
+La machine elle-même porte l'état entre deux morceaux (positions des rotors),
+le seul autre état est le nombre de lettres déjà émises, pour le groupage en
+blocs de 5. Concaténer la sortie de encrypt_stream donne exactement
+machine.encrypt(texte complet, ...). En mode passthrough, seules les lettres
+A–Z / a–z sont chiffrées (en majuscules), tout le reste est recopié tel quel.
+"""
+import codecs
+import mmap
+import os
+import re
+from typing import IO, Iterable, Iterator
+
+from core.machineEnigma import MachineEnigma
+from core.moteur_numpy import _NON_LETTRES, _NON_LETTRES_ESPACES, chiffrer_octets, nettoyer_octets, numpy_disponible
+
+# Taille de lecture par défaut pour encrypt_file (caractères)
+TAILLE_MORCEAU = 1 << 16
+
+# Taille des tranches lues dans le fichier projeté en mémoire (octets)
+TAILLE_BLOC_MMAP = 1 << 20
+
+_LETTRES = re.compile(r"[A-Za-z]+")
+
+
+def _grouper(cipher: str, deja: int) -> str:
+    """Groupage en blocs de 5 qui continue celui des morceaux précédents
+    (deja = nombre de lettres déjà émises)."""
+    out = []
+    for ch in cipher:
+        if deja and deja % 5 == 0:
+            out.append(" ")
+        out.append(ch)
+        deja += 1
+    return "".join(out)
+
+
+def encrypt_stream(
+    machine: MachineEnigma,
+    chunks: Iterable[str],
+    keep_spaces: bool = False,
+    passthrough: bool = False,
+    group_5: bool = False,
+) -> Iterator[str]:
+    """Générateur : chiffre chaque morceau de `chunks` et produit le morceau chiffré.
+    - keep_spaces : garde les espaces (comme encrypt).
+    - passthrough : recopie tout caractère non A–Z (ponctuation, retours à la ligne...).
+    - group_5 : sortie en blocs de 5 continue d'un morceau à l'autre (les autres
+      caractères sont alors ignorés, comme dans encrypt)."""
+    emises = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if group_5:
+            cipher = machine.encrypt(chunk, keep_spaces=False)
+            out = _grouper(cipher, emises)
+            emises += len(cipher)
+        elif passthrough:
+            cipher = machine.encrypt("".join(_LETTRES.findall(chunk)), keep_spaces=False)
+            pos = 0
+
+            def remplacer(m: "re.Match") -> str:
+                nonlocal pos
+                debut, pos = pos, pos + len(m.group())
+                return cipher[debut:pos]
+
+            out = _LETTRES.sub(remplacer, chunk)
+        else:
+            out = machine.encrypt(chunk, keep_spaces=keep_spaces)
+        if out:
+            yield out
+
+
+def encrypt_file(
+    machine: MachineEnigma,
+    src: "str | IO[str]",
+    dst: "str | IO[str]",
+    keep_spaces: bool = False,
+    passthrough: bool = False,
+    group_5: bool = False,
+    taille_morceau: int = TAILLE_MORCEAU,
+) -> int:
+    """Chiffre le fichier `src` vers `dst` (chemins ou fichiers texte déjà ouverts)
+    par morceaux de `taille_morceau` caractères. Renvoie le nombre de caractères écrits."""
+    f_src = open(src, "r", encoding="utf-8") if isinstance(src, str) else src
+    f_dst = open(dst, "w", encoding="utf-8") if isinstance(dst, str) else dst
+    try:
+        chunks = iter(lambda: f_src.read(taille_morceau), "")
+        ecrits = 0
+        for out in encrypt_stream(machine, chunks, keep_spaces, passthrough, group_5):
+            f_dst.write(out)
+            ecrits += len(out)
+        return ecrits
+    finally:
+        if f_src is not src:
+            f_src.close()
+        if f_dst is not dst:
+            f_dst.close()
+
+
+def _chiffrer_propre(machine: MachineEnigma, clean: bytes) -> bytes:
+    """Chiffre des octets déjà nettoyés (A–Z et espaces) et fait avancer la machine."""
+    if numpy_disponible():
+        out = chiffrer_octets(machine, clean)
+        machine.advance(len(clean) - clean.count(b" "))
+        return out
+    return machine.encrypt(clean.decode("ascii"), keep_spaces=True).encode("ascii")
+
+
+def _liberer(mm: mmap.mmap, debut: int, fin: int) -> None:
+    """Rend au système les pages déjà traitées de [debut, fin) pour que la mémoire
+    résidente reste plate (sans effet si madvise n'est pas disponible)."""
+    if not hasattr(mm, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    debut = -(-debut // mmap.PAGESIZE) * mmap.PAGESIZE
+    fin = fin // mmap.PAGESIZE * mmap.PAGESIZE
+    if fin > debut:
+        mm.madvise(mmap.MADV_DONTNEED, debut, fin - debut)
+
+
+def encrypt_mmap(
+    machine: MachineEnigma,
+    src: str,
+    dst: str,
+    keep_spaces: bool = False,
+    taille_bloc: int = TAILLE_BLOC_MMAP,
+) -> int:
+    """Chiffre le fichier `src` (UTF-8) vers `dst` en projetant les deux en mémoire.
+    L'entrée est lue par tranches d'octets, la sortie écrite directement dans un
+    fichier préalloué : la mémoire résidente ne dépend pas de la taille du fichier.
+    Résultat identique à machine.encrypt(contenu, keep_spaces). Renvoie le nombre
+    d'octets écrits."""
+    taille = os.path.getsize(src)
+    supprimer = _NON_LETTRES_ESPACES if keep_spaces else _NON_LETTRES
+    decodeur = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    ecrits = 0
+
+    with open(src, "rb") as f_src, open(dst, "w+b") as f_dst:
+        if taille == 0:
+            return 0
+        # Le nettoyage ne fait que retirer des caractères : la sortie tient dans la taille de l'entrée
+        f_dst.truncate(taille)
+        with mmap.mmap(f_src.fileno(), 0, access=mmap.ACCESS_READ) as entree, \
+                mmap.mmap(f_dst.fileno(), taille) as sortie:
+            for debut in range(0, taille, taille_bloc):
+                tranche = entree[debut:debut + taille_bloc]
+                if tranche.isascii() and not decodeur.getstate()[0]:
+                    clean = tranche.upper().translate(None, supprimer)
+                else:
+                    # Caractères non ASCII (éventuellement coupés entre deux tranches)
+                    clean = nettoyer_octets(decodeur.decode(tranche), keep_spaces)
+                out = _chiffrer_propre(machine, clean)
+                if ecrits + len(out) > len(sortie):
+                    sortie.resize(ecrits + len(out))
+                sortie[ecrits:ecrits + len(out)] = out
+                page = ecrits // mmap.PAGESIZE * mmap.PAGESIZE
+                sortie.flush(page, ecrits + len(out) - page)
+                _liberer(sortie, page, ecrits + len(out))
+                _liberer(entree, debut, debut + len(tranche))
+                ecrits += len(out)
+            sortie.flush()
+        f_dst.truncate(ecrits)
+    return ecrits
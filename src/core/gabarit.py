@@ -0,0 +1,117 @@
+"""Gabarits de machine compilés, mis en cache par configuration.
+
+Un gabarit (MachineTemplate) correspond à un ordre des rotors, des rings, un
+plugboard et un réflecteur : la validation et le calcul des tables ne sont
+faits qu'une fois. machine(positions) produit ensuite une MachineEnigma prête
+à l'emploi, à n'importe quelles positions de départ, par simple copie.
+
+    gabarit = compiler_machine(["I", "II", "III"], [0, 0, 0], ["AB", "CD"], "B")
+    machine = gabarit.machine("QEV")
+"""
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+from core.machineEnigma import A_IDX, MachineEnigma
+from utils.nettoyage import assertionError
+
+# Nombre de configurations gardées compilées
+TAILLE_CACHE = 128
+
+
+class MachineTemplate:
+    """Configuration validée et compilée, sans positions de départ."""
+
+    def __init__(
+        self,
+        rotors_names: Sequence[str],
+        ring_settings: Sequence[int],
+        plug_pairs: Sequence[str],
+        reflector_preset: str = "B",
+    ) -> None:
+        self.rotors_names = list(rotors_names)
+        self.ring_settings = list(ring_settings)
+        self.plug_pairs = list(plug_pairs)
+        self.reflector_preset = reflector_preset
+        # Machine de référence : toutes les validations et tables sont faites ici
+        self._prototype = MachineEnigma(
+            rotors_names=self.rotors_names,
+            positions="A" * len(self.rotors_names),
+            plug_pairs=self.plug_pairs,
+            reflector_preset=reflector_preset,
+            ring_settings=self.ring_settings,
+        )
+
+    def machine(self, positions: str) -> MachineEnigma:
+        """Nouvelle machine de cette configuration, placée aux positions données."""
+        n = len(self.rotors_names)
+        if len(positions) != n:
+            raise ValueError("positions doit être une chaîne de 3 lettres (LEFT,MIDDLE,RIGHT).")
+        depart = []
+        for lettre in positions:
+            idx = A_IDX.get(lettre.upper())
+            if idx is None:
+                assertionError("La position doit être une lettre A–Z.")
+            depart.append(idx)
+
+        machine = self._prototype.clone()
+        machine._placer(depart)
+        machine.positions_initiales = depart
+        return machine
+
+    def __repr__(self) -> str:
+        return (f"MachineTemplate(rotors={self.rotors_names}, rings={self.ring_settings}, "
+                f"plugboard={self.plug_pairs}, reflector={self.reflector_preset!r})")
+
+
+def _cle(
+    rotors_names: Sequence[str],
+    ring_settings: Sequence[int] | str | None,
+    plug_pairs: Sequence[str] | None,
+    reflector_preset: str,
+) -> Tuple:
+    """Forme canonique (hashable) d'une configuration, pour que deux écritures
+    équivalentes partagent le même gabarit."""
+    rotors = tuple(name.upper() for name in rotors_names)
+    if ring_settings is None:
+        rings = (0,) * len(rotors)
+    elif isinstance(ring_settings, str):
+        lettres = ring_settings.strip().upper()
+        if any(c not in A_IDX for c in lettres):
+            raise ValueError("ring_settings : lettres A–Z attendues.")
+        rings = tuple(A_IDX[c] for c in lettres)
+    else:
+        rings = tuple(r % 26 for r in ring_settings)
+    paires = tuple(sorted("".join(sorted(p.strip().upper())) for p in plug_pairs or []))
+    return rotors, rings, paires, reflector_preset.upper()
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def _compiler(rotors: Tuple[str, ...], rings: Tuple[int, ...], paires: Tuple[str, ...], reflector: str) -> MachineTemplate:
+    return MachineTemplate(rotors, rings, paires, reflector)
+
+
+def compiler_machine(
+    rotors_names: Sequence[str],
+    ring_settings: Sequence[int] | str | None = None,
+    plug_pairs: Sequence[str] | None = None,
+    reflector_preset: str = "B",
+) -> MachineTemplate:
+    """Gabarit compilé pour cette configuration (pris dans le cache s'il existe).
+    ring_settings accepte une liste d'entiers ou les lettres du livre de code ("AAB")."""
+    return _compiler(*_cle(rotors_names, ring_settings, plug_pairs, reflector_preset))
+
+
+def creer_machine(
+    rotors_names: Sequence[str],
+    positions: str,
+    plug_pairs: Sequence[str] | None = None,
+    reflector_preset: str = "B",
+    ring_settings: Sequence[int] | str | None = None,
+) -> MachineEnigma:
+    """Équivalent de MachineEnigma(...) (mêmes arguments), via le cache de gabarits."""
+    return compiler_machine(rotors_names, ring_settings, plug_pairs, reflector_preset).machine(positions)
+
+
+def vider_cache() -> None:
+    """Oublie tous les gabarits compilés."""
+    _compiler.cache_clear()
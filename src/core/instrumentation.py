@@ -0,0 +1,217 @@
+"""Instrumentation optionnelle : compteurs et chronomètres de production.
+
+Désactivée par défaut, elle ne coûte alors rien sur le chemin de frappe :
+activer() remplace quelques méthodes de MachineEnigma et de MachineTemplate
+par des versions instrumentées, desactiver() remet les originales. Le
+chargement du livre de code ne teste qu'un drapeau (ACTIF).
+
+Mesures collectées :
+- frappes : lettres chiffrées (encrypt_char, encrypt, encrypt_bulk) ;
+- pas.rotorK : pas effectués par le K-ième rotor en partant de la droite
+  (rotor1 = rotor rapide) ;
+- double_pas.rotorK : pas d'un rotor lent dus à son propre cran (le second pas
+  du double-stepping), inclus dans pas.rotorK ;
+- chronomètres construction (MachineEnigma(...)), gabarit (MachineTemplate.machine),
+  chiffrement, livre_code.lecture (fichier lu et validé) ; compteur
+  livre_code.cache pour les appels servis par le cache.
+
+Pour les chiffrements en bloc, les pas sont déduits des positions de départ en
+forme fermée (core.stepping), en O(nombre de rotors) par appel. Les processus
+de encrypt_parallel et le moteur NumPy de encrypt_file / encrypt_mmap ne sont
+pas comptés.
+
+    from core import instrumentation
+    instrumentation.activer()
+    ...
+    print(instrumentation.formater())
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+from core.stepping import compter as _compter_progression, instants_cran, nb_pas
+
+# Vrai entre activer() et desactiver()
+ACTIF = False
+
+_verrou = threading.Lock()
+_compteurs: Dict[str, int] = {}
+_chronos: Dict[str, List[float]] = {}  # nom -> [appels, secondes]
+
+# Profondeur d'appels encrypt en cours dans ce thread : le moteur de référence
+# passe par encrypt_char, dont les frappes sont alors déjà comptées par encrypt
+_local = threading.local()
+
+# Méthodes d'origine, remises par desactiver() : (classe, nom, méthode)
+_originales: List[tuple] = []
+
+
+# ---------------- Enregistrement ----------------
+def compter(nom: str, n: int = 1) -> None:
+    """Ajoute n au compteur `nom`."""
+    with _verrou:
+        _compteurs[nom] = _compteurs.get(nom, 0) + n
+
+
+def ajouter_temps(nom: str, secondes: float, appels: int = 1) -> None:
+    """Ajoute une durée (et un nombre d'appels) au chronomètre `nom`."""
+    with _verrou:
+        chrono = _chronos.setdefault(nom, [0, 0.0])
+        chrono[0] += appels
+        chrono[1] += secondes
+
+
+@contextmanager
+def chronometre(nom: str) -> Iterator[None]:
+    """Mesure le bloc dans le chronomètre `nom` (seulement si l'instrumentation est active)."""
+    if not ACTIF:
+        yield
+        return
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        ajouter_temps(nom, time.perf_counter() - debut)
+
+
+def _compter_pas(positions: List[int], crans: List[int], frappes: int) -> None:
+    """Pas par rotor et doubles pas pour `frappes` frappes depuis `positions`."""
+    n = len(positions)
+    pas = nb_pas(positions, crans, frappes)
+    crans_inst = instants_cran(positions, crans)
+    with _verrou:
+        _compteurs["frappes"] = _compteurs.get("frappes", 0) + frappes
+        for j in range(n):
+            nom = f"rotor{n - j}"
+            if pas[j]:
+                _compteurs["pas." + nom] = _compteurs.get("pas." + nom, 0) + pas[j]
+            doubles = _compter_progression(crans_inst[j], frappes) if j < n - 1 else 0
+            if doubles:
+                _compteurs["double_pas." + nom] = _compteurs.get("double_pas." + nom, 0) + doubles
+
+
+# ---------------- Versions instrumentées ----------------
+def _instrumenter_init(init: Callable) -> Callable:
+    def __init__(self, *args, **kwargs):
+        debut = time.perf_counter()
+        init(self, *args, **kwargs)
+        ajouter_temps("construction", time.perf_counter() - debut)
+    return __init__
+
+
+def _instrumenter_gabarit(machine: Callable) -> Callable:
+    def fabriquer(self, positions):
+        debut = time.perf_counter()
+        resultat = machine(self, positions)
+        ajouter_temps("gabarit", time.perf_counter() - debut)
+        return resultat
+    fabriquer.__name__ = machine.__name__
+    return fabriquer
+
+
+def _instrumenter_encrypt_char(encrypt_char: Callable) -> Callable:
+    def instrumente(self, ch):
+        avant = [r.position for r in self.rotors]
+        resultat = encrypt_char(self, ch)
+        n = len(avant)
+        # Le rotor rapide n'avance que si une lettre a été frappée
+        if self.rotors[-1].position != avant[-1] and not getattr(_local, "profondeur", 0):
+            crans = self._crans
+            with _verrou:
+                _compteurs["frappes"] = _compteurs.get("frappes", 0) + 1
+                for j, rotor in enumerate(self.rotors):
+                    if rotor.position != avant[j]:
+                        nom = f"rotor{n - j}"
+                        _compteurs["pas." + nom] = _compteurs.get("pas." + nom, 0) + 1
+                        if j < n - 1 and avant[j] == crans[j]:
+                            _compteurs["double_pas." + nom] = _compteurs.get("double_pas." + nom, 0) + 1
+        return resultat
+    instrumente.__name__ = encrypt_char.__name__
+    return instrumente
+
+
+def _instrumenter_encrypt(encrypt: Callable) -> Callable:
+    def instrumente(self, text, *args, **kwargs):
+        avant = [r.position for r in self.rotors]
+        profondeur = getattr(_local, "profondeur", 0)
+        _local.profondeur = profondeur + 1
+        debut = time.perf_counter()
+        try:
+            resultat = encrypt(self, text, *args, **kwargs)
+        finally:
+            _local.profondeur = profondeur
+        ajouter_temps("chiffrement", time.perf_counter() - debut)
+        # La sortie contient une lettre par frappe, plus d'éventuels espaces
+        _compter_pas(avant, self._crans, len(resultat) - resultat.count(" "))
+        return resultat
+    instrumente.__name__ = encrypt.__name__
+    return instrumente
+
+
+# ---------------- Activation ----------------
+def activer() -> None:
+    """Active l'instrumentation (sans effet si elle l'est déjà). Les compteurs
+    ne sont pas remis à zéro, voir reinitialiser()."""
+    global ACTIF
+    if ACTIF:
+        return
+    from core.gabarit import MachineTemplate
+    from core.machineEnigma import MachineEnigma
+
+    remplacements = [
+        (MachineEnigma, "__init__", _instrumenter_init),
+        (MachineEnigma, "encrypt_char", _instrumenter_encrypt_char),
+        (MachineEnigma, "encrypt", _instrumenter_encrypt),
+        (MachineEnigma, "encrypt_bulk", _instrumenter_encrypt),
+        (MachineTemplate, "machine", _instrumenter_gabarit),
+    ]
+    for classe, nom, instrumenter in remplacements:
+        originale = classe.__dict__[nom]
+        _originales.append((classe, nom, originale))
+        setattr(classe, nom, instrumenter(originale))
+    ACTIF = True
+
+
+def desactiver() -> None:
+    """Remet les méthodes d'origine ; les mesures déjà collectées sont gardées."""
+    global ACTIF
+    while _originales:
+        classe, nom, originale = _originales.pop()
+        setattr(classe, nom, originale)
+    ACTIF = False
+
+
+def reinitialiser() -> None:
+    """Remet tous les compteurs et chronomètres à zéro."""
+    with _verrou:
+        _compteurs.clear()
+        _chronos.clear()
+
+
+# ---------------- Lecture ----------------
+def instantane() -> Dict:
+    """Copie des mesures courantes :
+    {"actif": bool, "compteurs": {nom: n}, "chronos": {nom: {"appels": n, "secondes": s}}}."""
+    with _verrou:
+        return {
+            "actif": ACTIF,
+            "compteurs": dict(_compteurs),
+            "chronos": {nom: {"appels": int(a), "secondes": s} for nom, (a, s) in _chronos.items()},
+        }
+
+
+def formater(mesures: Dict | None = None) -> str:
+    """Mesures en texte brut, une par ligne (`nom valeur`), triées par nom ;
+    pour un chronomètre : appels, total en secondes et moyenne en microsecondes."""
+    if mesures is None:
+        mesures = instantane()
+    lignes = ["# compteurs"]
+    for nom in sorted(mesures["compteurs"]):
+        lignes.append(f"{nom} {mesures['compteurs'][nom]}")
+    lignes.append("# chronos (appels, secondes, µs/appel)")
+    for nom in sorted(mesures["chronos"]):
+        chrono = mesures["chronos"][nom]
+        moyenne = chrono["secondes"] / chrono["appels"] * 1e6 if chrono["appels"] else 0.0
+        lignes.append(f"{nom} {chrono['appels']} {chrono['secondes']:.6f} {moyenne:.1f}")
+    return "\n".join(lignes)
@@ -0,0 +1,187 @@
+"""Chiffrement par lot : un ou plusieurs textes sous de nombreuses clés à la fois.
+
+Une clé est un dictionnaire au format du livre de code :
+    {"rotors": [...], "positions": "ABC", "rings": [0, 0, 0] ou "AAA",
+     "plugboard": ["AB", ...], "reflector": "B"}
+("rings", "plugboard" et "reflector" sont optionnels).
+
+Avec NumPy, toutes les clés ayant le même nombre de rotors sont traitées
+ensemble : les tables de chaque clé sont empilées et le message traverse
+plugboard, rotors et réflecteur comme des lectures sur des tableaux
+(clés x frappes). La préparation Python par clé se limite à la validation et
+au calcul en O(rotors) des frappes où chaque rotor avance (core.stepping).
+Sans NumPy, on retombe sur une MachineEnigma par clé (même résultat).
+"""
+from typing import Dict, List, Sequence
+
+from core.gabarit import creer_machine
+from core.moteur_numpy import np, numpy_disponible, nettoyer_octets, _frappes_dans, _tables_np
+from core.plugboard import MAX_PAIRES
+from core.stepping import frappes_pas
+from configuration.configuration import ALPHABET, REFLECTORS, ROTORS
+from utils.formatage import group5
+from utils.nettoyage import assertionError, est_liste_paires_valides
+
+# Nombre maximal de cases (clés x frappes) traitées d'un coup
+TAILLE_BLOC = 1 << 20
+
+
+def normaliser_cle(cle: Dict) -> Dict:
+    """Valide une clé et la met sous forme canonique :
+    rotors (noms), positions / rings / crans (index 0..25), plugboard (paires), reflector."""
+    rotors = [name.upper() for name in cle["rotors"]]
+    n = len(rotors)
+    if n < 3 or n > 8:
+        raise ValueError("Le nombre de rotors doit être entre 3 et 8.")
+    for name in rotors:
+        if name not in ROTORS:
+            assertionError(f"Rotor inconnu: {name!r}. Choisir parmi: {', '.join(ROTORS)}")
+
+    positions = "".join(cle["positions"]).upper()
+    if len(positions) != n or any(c not in ALPHABET for c in positions):
+        raise ValueError("positions doit contenir une lettre A–Z par rotor.")
+
+    rings = cle.get("rings")
+    if rings is None:
+        rings = [0] * n
+    elif isinstance(rings, str):
+        rings = [ALPHABET.index(c) for c in rings.strip().upper()]
+    if len(rings) != n:
+        raise ValueError("ring_settings doit être une liste de même longueur que rotors_names.")
+
+    plugboard = [p.strip().upper() for p in cle.get("plugboard") or []]
+    if len(plugboard) > MAX_PAIRES:
+        assertionError(f"Le plugboard ne peut pas avoir plus de {MAX_PAIRES} paires de connexions.")
+    est_liste_paires_valides(plugboard)
+
+    reflector = (cle.get("reflector") or "B").upper()
+    if reflector not in REFLECTORS:
+        assertionError(f"Reflecteur inconnu: {reflector!r}. Choisir parmi: {', '.join(REFLECTORS)}")
+
+    return {
+        "rotors": rotors,
+        "positions": [ALPHABET.index(c) for c in positions],
+        "rings": [r % 26 for r in rings],
+        "crans": [ALPHABET.index(ROTORS[name][1]) for name in rotors],
+        "plugboard": plugboard,
+        "reflector": reflector,
+    }
+
+
+def _table_plugboard(paires: Sequence[str]) -> "np.ndarray":
+    table = np.arange(26, dtype=np.uint8)
+    for a, b in paires:
+        table[ord(a) - 65], table[ord(b) - 65] = ord(b) - 65, ord(a) - 65
+    return table
+
+
+def _table_reflecteur(preset: str) -> "np.ndarray":
+    return np.frombuffer(REFLECTORS[preset].encode("ascii"), dtype=np.uint8) - 65
+
+
+def _chiffrer_groupe(cles: List[Dict], lettres: "np.ndarray") -> "np.ndarray":
+    """Chiffre lettres[k] sous cles[k] ; toutes les clés ont le même nombre de rotors."""
+    k, longueur = lettres.shape
+    n = len(cles[0]["rotors"])
+    decal676 = (np.arange(k, dtype=np.int64) * 676)[:, None]
+    decal26 = (np.arange(k, dtype=np.int64) * 26)[:, None]
+
+    plug = np.concatenate([_table_plugboard(c["plugboard"]) for c in cles])
+    refl = np.concatenate([_table_reflecteur(c["reflector"]) for c in cles])
+    fwd, rev, pos = [], [], []
+    for j in range(n):
+        tables = [_tables_np(ROTORS[c["rotors"][j]][0], c["rings"][j]) for c in cles]
+        fwd.append(np.concatenate([t[0].ravel() for t in tables]))
+        rev.append(np.concatenate([t[1].ravel() for t in tables]))
+
+    # Positions de chaque rotor à chaque frappe, pour toutes les clés
+    progs = [frappes_pas(c["positions"], c["crans"]) for c in cles]
+    depart = np.array([c["positions"] for c in cles], dtype=np.int64)
+    for j in range(n - 1):
+        avance = np.zeros((k, longueur), dtype=bool)
+        for i in range(k):
+            for prog in progs[i][j]:
+                avance[i, _frappes_dans(prog, 0, longueur) - 1] = True
+        pos.append((depart[:, j:j + 1] + np.cumsum(avance, axis=1)) % 26 * 26 + decal676)
+    pos.append((depart[:, n - 1:] + 1 + np.arange(longueur, dtype=np.int64)) % 26 * 26 + decal676)
+
+    x = plug[decal26 + lettres]
+    for j in range(n - 1, -1, -1):
+        x = fwd[j][pos[j] + x]
+    x = refl[decal26 + x]
+    for j in range(n):
+        x = rev[j][pos[j] + x]
+    return plug[decal26 + x]
+
+
+def _chiffrer_lettres(cles: List[Dict], lettres: List["np.ndarray"]) -> List["np.ndarray"]:
+    """Chiffre des suites de lettres (index) de longueurs quelconques, une par clé."""
+    res: List["np.ndarray"] = [None] * len(cles)
+    par_taille: Dict[int, List[int]] = {}
+    for i, c in enumerate(cles):
+        par_taille.setdefault(len(c["rotors"]), []).append(i)
+
+    for indices in par_taille.values():
+        longueur = max(len(lettres[i]) for i in indices)
+        if longueur == 0:
+            for i in indices:
+                res[i] = lettres[i]
+            continue
+        par_bloc = max(1, TAILLE_BLOC // longueur)
+        for d in range(0, len(indices), par_bloc):
+            bloc = indices[d:d + par_bloc]
+            tampon = np.zeros((len(bloc), longueur), dtype=np.int64)
+            for ligne, i in enumerate(bloc):
+                tampon[ligne, :len(lettres[i])] = lettres[i]
+            out = _chiffrer_groupe([cles[i] for i in bloc], tampon)
+            for ligne, i in enumerate(bloc):
+                res[i] = out[ligne, :len(lettres[i])]
+    return res
+
+
+def encrypt_batch(
+    cles: Sequence[Dict],
+    texts: str | Sequence[str],
+    keep_spaces: bool = False,
+    group_5: bool = False,
+) -> List[str]:
+    """Chiffre sous chaque clé de `cles` soit le même texte (texts: str), soit le
+    texte correspondant (texts: liste de même longueur). Chaque résultat est
+    identique à MachineEnigma(...).encrypt(text, keep_spaces, group_5)."""
+    if isinstance(texts, str):
+        texts = [texts] * len(cles)
+    if len(texts) != len(cles):
+        raise ValueError("texts doit être une chaîne ou une liste de même longueur que cles.")
+
+    normalisees = [normaliser_cle(c) for c in cles]
+    if not numpy_disponible():
+        return [_encrypt_machine(c, t, keep_spaces, group_5) for c, t in zip(normalisees, texts)]
+
+    # Chaque texte distinct n'est nettoyé qu'une fois (cas fréquent : même texte pour toutes les clés)
+    propres: Dict[str, "np.ndarray"] = {}
+    for t in texts:
+        if t not in propres:
+            propres[t] = np.frombuffer(nettoyer_octets(t, keep_spaces), dtype=np.uint8)
+    masques = {t: arr != 32 for t, arr in propres.items()}
+
+    lettres = [propres[t][masques[t]].astype(np.int64) - 65 for t in texts]
+    chiffres = _chiffrer_lettres(normalisees, lettres)
+
+    resultats = []
+    for t, ch in zip(texts, chiffres):
+        out = propres[t].copy()
+        out[masques[t]] = ch + 65
+        cipher = out.tobytes().decode("ascii")
+        resultats.append(group5(cipher.replace(" ", "")) if group_5 else cipher)
+    return resultats
+
+
+def _encrypt_machine(cle: Dict, text: str, keep_spaces: bool, group_5: bool) -> str:
+    machine = creer_machine(
+        rotors_names=cle["rotors"],
+        positions="".join(ALPHABET[p] for p in cle["positions"]),
+        plug_pairs=cle["plugboard"],
+        reflector_preset=cle["reflector"],
+        ring_settings=cle["rings"],
+    )
+    return machine.encrypt(text, keep_spaces=keep_spaces, group_5=group_5)
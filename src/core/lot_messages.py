@@ -0,0 +1,129 @@
+"""Chiffrement de nombreux messages en un seul appel (mode --lot de main.py).
+
+Chaque message est chiffré comme par un appel séparé de main.py : machine
+neuve aux positions de départ de sa configuration. Le livre de code n'est lu
+qu'une fois et chaque configuration n'est compilée qu'une fois
+(core.gabarit) ; les résultats sont écrits au fil de l'eau.
+
+Deux formats d'entrée :
+- texte : un message par ligne, tous sous la configuration par défaut ;
+- JSON Lines : un objet par ligne, {"msg": "...", "date": "...",
+  "positions": "...", "rings": "..." ou [..], "reseau": "..."}, tous les
+  champs sauf "msg" étant optionnels. La sortie reprend l'objet avec le
+  résultat dans "resultat" (ou le message d'erreur dans "erreur").
+"""
+import json
+import sys
+import time
+from typing import IO, Dict, Iterable, Iterator
+
+from core.gabarit import compiler_machine
+from core.machineEnigma import MachineEnigma
+from configuration.livre_code import charger_livre_code
+
+
+def lire_lignes(chemins: Iterable[str]) -> Iterator[str]:
+    """Lignes (sans fin de ligne) des fichiers donnés, ou de l'entrée standard si
+    la liste est vide ou pour '-'."""
+    chemins = list(chemins) or ["-"]
+    for chemin in chemins:
+        if chemin == "-":
+            for ligne in sys.stdin:
+                yield ligne.rstrip("\r\n")
+            continue
+        with open(chemin, "r", encoding="utf-8") as f:
+            for ligne in f:
+                yield ligne.rstrip("\r\n")
+
+
+class ConfigurationsLot:
+    """Entrées du livre de code et machines, résolues une fois par configuration."""
+
+    def __init__(self, livre_path: str, date_defaut: str | None = None, reseau: str = "") -> None:
+        self.livre = charger_livre_code(livre_path)
+        self.reseau = reseau
+        self.date_defaut = date_defaut or self.livre.date_du_jour(reseau=reseau)
+        self._entrees: Dict = {}
+        self._gabarits: Dict = {}
+
+    def entree(self, date_str: str | None = None, reseau: str | None = None) -> Dict:
+        cle = (date_str or self.date_defaut, self.reseau if reseau is None else reseau)
+        entree = self._entrees.get(cle)
+        if entree is None:
+            entree = self._entrees[cle] = self.livre.entree(*cle)
+        return entree
+
+    def machine(self, date_str=None, reseau=None, positions=None, rings=None) -> MachineEnigma:
+        """Machine neuve pour la configuration du jour `date_str`, avec éventuellement
+        d'autres positions de départ et rings."""
+        entree = self.entree(date_str, reseau)
+        cle = (date_str, reseau, rings if rings is None or isinstance(rings, str) else tuple(rings))
+        gabarit = self._gabarits.get(cle)
+        if gabarit is None:
+            gabarit = self._gabarits[cle] = compiler_machine(
+                entree["rotors"],
+                entree.get("rings") if rings is None else rings,
+                entree["plugboard"],
+                entree.get("reflector") or "B",
+            )
+        return gabarit.machine(positions or entree["positions"])
+
+
+def chiffrer_lot(
+    lignes: Iterable[str],
+    sortie: IO[str],
+    configs: ConfigurationsLot,
+    jsonl: bool = False,
+    group_5: bool = False,
+    erreurs: IO[str] | None = None,
+) -> Dict:
+    """Chiffre chaque ligne et écrit le résultat dans `sortie` (une ligne par entrée,
+    dans le même ordre). Les erreurs d'une ligne (date inconnue, positions
+    invalides...) n'arrêtent pas le lot. Renvoie les statistiques du lot."""
+    if erreurs is None:
+        erreurs = sys.stderr
+    stats = {"messages": 0, "erreurs": 0, "caracteres": 0}
+    debut = time.perf_counter()
+
+    for numero, ligne in enumerate(lignes, 1):
+        stats["messages"] += 1
+        if jsonl:
+            if not ligne.strip():
+                stats["messages"] -= 1
+                continue
+            objet = None
+            try:
+                objet = json.loads(ligne)
+                msg = objet["msg"]
+                machine = configs.machine(
+                    objet.get("date"), objet.get("reseau"), objet.get("positions"), objet.get("rings")
+                )
+                objet["resultat"] = machine.encrypt(msg, keep_spaces=True, group_5=group_5)
+                stats["caracteres"] += len(msg)
+            except (KeyError, ValueError, AssertionError, TypeError, AttributeError) as e:
+                stats["erreurs"] += 1
+                objet = objet if isinstance(objet, dict) else {}
+                objet["erreur"] = f"ligne {numero} : {e}"
+            sortie.write(json.dumps(objet, ensure_ascii=False) + "\n")
+        else:
+            try:
+                resultat = configs.machine().encrypt(ligne, keep_spaces=True, group_5=group_5)
+                stats["caracteres"] += len(ligne)
+            except (KeyError, ValueError, AssertionError) as e:
+                stats["erreurs"] += 1
+                resultat = ""
+                erreurs.write(f"ligne {numero} : {e}\n")
+            sortie.write(resultat + "\n")
+
+    stats["secondes"] = time.perf_counter() - debut
+    return stats
+
+
+def formater_stats(stats: Dict) -> str:
+    """Résumé d'un lot : messages, erreurs, débit."""
+    duree = max(stats["secondes"], 1e-9)
+    return (
+        f"{stats['messages']} messages ({stats['erreurs']} erreurs), "
+        f"{stats['caracteres']} caractères en {stats['secondes']:.3f} s : "
+        f"{stats['messages'] / duree:.0f} messages/s, {stats['caracteres'] / duree:.0f} caractères/s"
+    )
@@ -1,14 +1,26 @@
-from typing import List
+from typing import Dict, Iterable, Iterator, List
 
 from core.plugboard import Plugboard
 from core.reflecteur import Reflecteur
 from core.rotors import create_rotor, Rotor
+from core.moteurs import choisir_moteur
+from core.stepping import positions_apres
 from configuration.configuration import ALPHABET
 from utils.formatage import only_letters, group5
+from utils.nettoyage import assertionError
 
 A_IDX = {c: i for i, c in enumerate(ALPHABET)}
 IDX_A = {i: c for c, i in A_IDX.items()}
 
+# Nombre maximal de compositions des rotors profonds gardées par configuration
+MAX_COMPOSITIONS = 4096
+
+
+def nettoyer_texte(text: str, keep_spaces: bool = False) -> str:
+    """Nettoyage appliqué par encrypt avant chiffrement (A–Z, plus les espaces si keep_spaces)."""
+    # Avec keep_spaces, on garde les espaces, mais la machine les ignore dans le stepping
+    return only_letters(text, keep_spaces=keep_spaces)
+
 
 class MachineEnigma:
     def __init__(
@@ -47,6 +59,19 @@ class MachineEnigma:
         for name, pos_letter, ring in zip(self.rotor_names, positions, ring_settings):
             self.rotors.append(create_rotor(name, position=pos_letter, ring_setting=ring))
 
+        # Positions de départ (index), référence pour seek()
+        self.positions_initiales = [r.position for r in self.rotors]
+        self._crans = [r.notch_idx for r in self.rotors]
+
+        # Permutation composée de la partie "lente" (rotors à gauche du rapide + réflecteur).
+        # Recalculée paresseusement, seulement quand un de ces rotors a bougé.
+        self._interne: List[int] | None = None
+        self._profond: List[int] = []
+        self._cle_profond: tuple | None = None
+        # Compositions des rotors profonds déjà calculées, par positions ;
+        # partagé avec les clones (même câblage), donc entre messages d'une même configuration
+        self._compositions: Dict[tuple, List[int]] = {}
+
     # ---------------- Stepping (double-step correct) ----------------
     def _step_rotors(self) -> None:
         """ Règle:
@@ -74,62 +99,206 @@ class MachineEnigma:
             if will_step[i]:
                 rotor.step()
 
-    # ---------------- Chiffrement d'un index ----------------
-    def _enc_idx(self, idx: int) -> int:
-        # Aller : du rotor le plus à droite vers le plus à gauche
-        for rotor in reversed(self.rotors):
-            idx = rotor.map_forward(idx)
+        # Seul le rotor rapide a bougé : la permutation interne reste valable
+        if any(will_step[:-1]):
+            self._interne = None
 
-        # Réflecteur
-        ch = IDX_A[idx]
-        ch_ref = self.reflector.allumer_lettre(ch)
-        idx = A_IDX[ch_ref]
+    def _composer_interne(self) -> List[int]:
+        """Compose la permutation (26 entrées) des rotors lents, aller, réflecteur, retour.
+        Attention : si on modifie la position d'un rotor à la main, il faut remettre
+        self._interne à None pour forcer le recalcul.
 
-        # Retour : du rotor le plus à gauche vers le plus à droite
-        for rotor in self.rotors:
-            idx = rotor.map_reverse(idx)
+        Les rotors à gauche du rotor du milieu bougent 25 fois moins souvent que lui :
+        leur composition (avec le réflecteur) est gardée tant que leurs positions
+        ne changent pas, et seul le rotor du milieu est recomposé. Chaque composition
+        calculée est aussi mémorisée par positions, pour la machine et ses clones."""
+        lents = self.rotors[:-1]
+        milieu = lents[-1]
+        profonds = lents[:-1]
+
+        cle = tuple(r.position for r in profonds)
+        if cle != self._cle_profond:
+            perm = self._compositions.get(cle)
+            if perm is None:
+                perm = []
+                for idx in range(26):
+                    for rotor in reversed(profonds):
+                        idx = rotor.map_forward(idx)
+                    idx = self.reflector.table[idx]
+                    for rotor in profonds:
+                        idx = rotor.map_reverse(idx)
+                    perm.append(idx)
+                if len(self._compositions) >= MAX_COMPOSITIONS:
+                    self._compositions.clear()
+                self._compositions[cle] = perm
+            self._profond = perm
+            self._cle_profond = cle
+
+        fwd = milieu.tables_forward[milieu.position]
+        rev = milieu.tables_reverse[milieu.position]
+        profond = self._profond
+        return [rev[profond[fwd[idx]]] for idx in range(26)]
+
+    # ---------------- Chiffrement d'un index ----------------
+    def _enc_idx(self, idx: int) -> int:
+        interne = self._interne
+        if interne is None:
+            interne = self._interne = self._composer_interne()
 
-        return idx
+        # Aller dans le rotor rapide, puis rotors lents + réflecteur d'un seul coup,
+        # puis retour dans le rotor rapide
+        rapide = self.rotors[-1]
+        idx = rapide.map_forward(idx)
+        idx = interne[idx]
+        return rapide.map_reverse(idx)
 
 
 
     def encrypt_char(self, ch: str) -> str:
         """Chiffre un caractère. Non-A–Z renvoyé tel quel (pratique pour garder espaces/ponctuation si souhaité)."""
-        if ch.upper() not in ALPHABET:
+        idx = A_IDX.get(ch.upper())
+        if idx is None:
+            if ch.upper() in ALPHABET:
+                assertionError("encrypt_char attend un caractère unique.")
             return ch
         self._step_rotors()  # la machine step AVANT le trajet
-        # Plugboard IN
-        x = self.plugboard.permuter(ch)
-        idx = A_IDX[x.upper()]
-
-        # Rotors + Reflecteur + Rotors
-        idx_out = self._enc_idx(idx)
-        y = IDX_A[idx_out]
+        # Plugboard IN, rotors + réflecteur + rotors, plugboard OUT : uniquement des index
+        plug = self.plugboard.table
+        return IDX_A[plug[self._enc_idx(plug[idx])]]
 
-        # Plugboard OUT
-        y2 = self.plugboard.permuter(y)
-        return y2
-
-    def encrypt(self, text: str, keep_spaces: bool = False, group_5: bool = False) -> str:
+    def encrypt(
+        self,
+        text: str,
+        keep_spaces: bool = False,
+        group_5: bool = False,
+        backend: str | None = None,
+    ) -> str:
         """
         Chiffre un texte.
         - keep_spaces: si False, on nettoie en A–Z uniquement ; sinon, on garde les espaces.
         - group_5: regroupe la sortie en blocs de 5.
+        - backend: "reference", "tables" ou "numpy" ; par défaut choisi selon la longueur
+          du texte (voir core.moteurs). Tous donnent le même résultat.
         """
-        if keep_spaces:
-            # On enlève tout sauf A–Z et espaces, mais la machine ignore les espaces dans le stepping:
-            clean = "".join(c if c == " " or c.upper() in ALPHABET else "" for c in text.upper())
-        else:
-            clean = only_letters(text, keep_spaces=False)
-
-        out = []
-        for ch in clean:
-            if ch == " ":
-                out.append(" ")  # n'affecte pas les rotors, pour m'aider à la lisibilité...
-                continue
-            out.append(self.encrypt_char(ch))
-
-        cipher = "".join(out)
+        clean = nettoyer_texte(text, keep_spaces)
+        cipher = choisir_moteur(len(clean), backend)(self, clean)
+        if group_5:
+            return group5(cipher.replace(" ", ""))
+        return cipher
+
+    # ---------------- Accès direct dans le flux de frappes ----------------
+    def _placer(self, positions: List[int]) -> None:
+        for rotor, pos in zip(self.rotors, positions):
+            rotor.position = pos
+        self._interne = None
+
+    def get_state(self) -> int:
+        """État courant sous forme compacte (hashable) : les positions de tous les
+        rotors en base 26 dans un seul entier, rotor de gauche en poids fort.
+        Le câblage, les rings et le plugboard ne changent pas : ils n'en font pas partie."""
+        etat = 0
+        for rotor in self.rotors:
+            etat = etat * 26 + rotor.position
+        return etat
+
+    def set_state(self, etat: int) -> None:
+        """Replace les rotors dans un état obtenu par get_state()."""
+        n = len(self.rotors)
+        if not 0 <= etat < 26 ** n:
+            raise ValueError(f"État invalide pour une machine à {n} rotors: {etat!r}.")
+        positions = [0] * n
+        for i in range(n - 1, -1, -1):
+            etat, positions[i] = divmod(etat, 26)
+        self._placer(positions)
+
+    def clone(self) -> "MachineEnigma":
+        """Copie indépendante (positions des rotors, plugboard) qui partage les tables
+        de câblage, sans refaire la validation ni la construction des composants."""
+        double = MachineEnigma.__new__(MachineEnigma)
+        double.__dict__.update(self.__dict__)
+        double.rotors = [r.copie() for r in self.rotors]
+        double.plugboard = self.plugboard.copie()
+        double.positions_initiales = list(self.positions_initiales)
+        return double
+
+    def advance(self, n: int) -> None:
+        """Avance la machine de n frappes depuis son état courant, comme n appels à
+        _step_rotors, mais en O(nombre de rotors) quel que soit n."""
+        positions = [r.position for r in self.rotors]
+        self._placer(positions_apres(positions, self._crans, n))
+
+    def seek(self, n: int) -> None:
+        """Place la machine juste après la n-ième frappe comptée depuis les positions
+        initiales (seek(0) = retour aux positions de départ)."""
+        self._placer(positions_apres(self.positions_initiales, self._crans, n))
+
+    # ---------------- Chiffrement en flux ----------------
+    def encrypt_stream(
+        self,
+        chunks: Iterable[str],
+        keep_spaces: bool = False,
+        passthrough: bool = False,
+        group_5: bool = False,
+    ) -> Iterator[str]:
+        """Chiffre un itérable de morceaux de texte, en mémoire constante.
+        Voir core.flux.encrypt_stream."""
+        from core.flux import encrypt_stream
+
+        return encrypt_stream(self, chunks, keep_spaces=keep_spaces, passthrough=passthrough, group_5=group_5)
+
+    def encrypt_file(
+        self,
+        src,
+        dst,
+        keep_spaces: bool = False,
+        passthrough: bool = False,
+        group_5: bool = False,
+    ) -> int:
+        """Chiffre un fichier (chemin ou fichier ouvert) vers un autre, par morceaux.
+        Voir core.flux.encrypt_file."""
+        from core.flux import encrypt_file
+
+        return encrypt_file(self, src, dst, keep_spaces=keep_spaces, passthrough=passthrough, group_5=group_5)
+
+    def encrypt_mmap(self, src: str, dst: str, keep_spaces: bool = False) -> int:
+        """Chiffre un très gros fichier via des fichiers projetés en mémoire (mémoire
+        résidente constante). Voir core.flux.encrypt_mmap."""
+        from core.flux import encrypt_mmap
+
+        return encrypt_mmap(self, src, dst, keep_spaces=keep_spaces)
+
+    # ---------------- Chiffrement multi-processus ----------------
+    def encrypt_parallel(
+        self,
+        text: str,
+        workers: int | None = None,
+        keep_spaces: bool = False,
+        group_5: bool = False,
+    ) -> str:
+        """Même résultat que encrypt, en répartissant le texte sur plusieurs processus.
+        Voir core.parallele.encrypt_parallel."""
+        from core.parallele import encrypt_parallel
+
+        return encrypt_parallel(self, text, workers=workers, keep_spaces=keep_spaces, group_5=group_5)
+
+    # ---------------- Chiffrement en bloc (NumPy) ----------------
+    def encrypt_array(self, lettres):
+        """Chiffre un tableau NumPy d'indices de lettres (A=0 .. Z=25) et renvoie un
+        tableau uint8 d'indices. Résultat et état final identiques à encrypt_char
+        appelé lettre par lettre. Nécessite NumPy."""
+        from core.moteur_numpy import chiffrer_indices
+
+        out = chiffrer_indices(self, lettres)
+        self.advance(len(out))
+        return out
+
+    def encrypt_bulk(self, text: str, keep_spaces: bool = False, group_5: bool = False) -> str:
+        """Même résultat que encrypt, via le moteur vectorisé (longs textes). Nécessite NumPy."""
+        from core.moteur_numpy import chiffrer_octets, nettoyer_octets
+
+        clean = nettoyer_octets(text, keep_spaces)
+        cipher = chiffrer_octets(self, clean).decode("ascii")
+        self.advance(len(clean) - clean.count(b" "))
         if group_5:
             return group5(cipher.replace(" ", ""))
         return cipher
@@ -0,0 +1,163 @@
+"""Moteur de chiffrement vectorisé (NumPy) pour les longs textes.
+
+Au lieu de boucler caractère par caractère, on calcule d'un coup la suite des
+positions des rotors (voir core.stepping), puis on applique plugboard, rotors et
+réflecteur comme des lectures de tables sur des tampons uint8.
+
+Astuce : les rotors lents ne bougent qu'environ une frappe sur 26. On découpe
+donc le message en segments où ils sont immobiles, on compose leur permutation
+(avec le réflecteur) une seule fois par segment, puis chaque caractère ne coûte
+que trois lectures : plugboard + rotor rapide, permutation du segment,
+rotor rapide retour + plugboard.
+
+NumPy est optionnel : sans lui, ce module s'importe mais ses fonctions lèvent
+ImportError.
+"""
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel, seul ce moteur en dépend
+    np = None
+
+from core.rotors import _compiler_tables
+from core.stepping import frappes_pas, nb_pas
+
+# Nombre de frappes traitées par bloc : borne la mémoire de travail et garde
+# les tableaux intermédiaires dans le cache processeur
+TAILLE_BLOC = 1 << 16
+
+_LETTRES = None if np is None else np.arange(26, dtype=np.int64)
+_NON_LETTRES = bytes(b for b in range(256) if not (65 <= b <= 90))
+_NON_LETTRES_ESPACES = bytes(b for b in _NON_LETTRES if b != 32)
+
+
+def numpy_disponible() -> bool:
+    """True si NumPy est installé."""
+    return np is not None
+
+
+def _exiger_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy est requis pour le moteur vectorisé (pip install numpy).")
+
+
+@lru_cache(maxsize=None)
+def _tables_np(wiring: str, ring_setting: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Tables aller/retour d'un rotor sous forme de tableaux (26, 26) uint8."""
+    forward, reverse = _compiler_tables(wiring, ring_setting)
+    return np.array(forward, dtype=np.uint8), np.array(reverse, dtype=np.uint8)
+
+
+def _trier_unique(x: "np.ndarray") -> "np.ndarray":
+    """Trie et dédoublonne (les tableaux sont petits et presque triés)."""
+    x = np.sort(x)
+    if len(x) > 1:
+        x = x[np.concatenate(([True], x[1:] != x[:-1]))]
+    return x
+
+
+def _frappes_dans(prog, lo: int, hi: int) -> "np.ndarray":
+    """Frappes k de la progression avec lo < k <= hi."""
+    initiaux, premier, periode = prog
+    debut = premier
+    if debut <= lo:
+        debut += ((lo - premier) // periode + 1) * periode
+    res = np.arange(debut, hi + 1, periode, dtype=np.int64)
+    init = [x for x in initiaux if lo < x <= hi]
+    if init:
+        res = np.concatenate((np.array(init, dtype=np.int64), res))
+    return res
+
+
+def _chiffrer_bloc(
+    lettres: "np.ndarray",
+    k0: int,
+    positions: Sequence[int],
+    crans: Sequence[int],
+    progs: List,
+    tables: List[Tuple["np.ndarray", "np.ndarray"]],
+    plug: "np.ndarray",
+    refl: "np.ndarray",
+) -> "np.ndarray":
+    """Chiffre les frappes k0+1 .. k0+len(lettres)."""
+    n = len(positions)
+    b = len(lettres)
+    pas0 = nb_pas(positions, crans, k0)
+
+    # Frappes (indices locaux au bloc) où chaque rotor lent avance ; elles sont rares
+    # (au plus une toutes les 26 frappes), on reste donc sur des tableaux creux.
+    evenements = []
+    for j in range(n - 1):
+        ev = np.concatenate([_frappes_dans(prog, k0, k0 + b) for prog in progs[j]]) - (k0 + 1)
+        evenements.append(_trier_unique(ev))
+
+    # Permutation interne (réflecteur + rotors lents), composée de gauche à droite :
+    # au niveau j, un segment commence dès qu'un des rotors 0..j bouge. Les rotors de
+    # gauche bougeant 25 fois moins souvent que leur voisin, chaque niveau ne coûte
+    # qu'une fraction du suivant.
+    debuts = np.zeros(1, dtype=np.int64)
+    interne = refl[None, :].astype(np.int64)
+    for j in range(n - 1):
+        nouveaux = _trier_unique(np.concatenate((debuts, evenements[j])))
+        parent = (np.searchsorted(debuts, nouveaux, side="right") - 1) * 26
+        pos = (positions[j] + pas0[j] + np.searchsorted(evenements[j], nouveaux, side="right")) % 26 * 26
+        x = tables[j][0].ravel()[pos[:, None] + _LETTRES]
+        x = interne.ravel()[parent[:, None] + x]
+        interne = tables[j][1].ravel()[pos[:, None] + x].astype(np.int64)
+        debuts = nouveaux
+    segment26 = np.repeat(np.arange(len(debuts), dtype=np.int64) * 26, np.diff(np.append(debuts, b)))
+    interne = interne.ravel()
+
+    # Rotor rapide, plugboard compris dans ses tables ; sa position suit un motif de période 26
+    fwd_rapide, rev_rapide = tables[n - 1]
+    entree = fwd_rapide[:, plug].ravel()
+    sortie = plug[rev_rapide].ravel()
+    motif = (positions[n - 1] + k0 + 1 + np.arange(26, dtype=np.int64)) % 26 * 26
+    pos_rapide = np.tile(motif, b // 26 + 1)[:b]
+
+    a = entree[pos_rapide + lettres]
+    a = interne[segment26 + a]
+    return sortie[pos_rapide + a]
+
+
+def chiffrer_indices(machine, lettres: "np.ndarray") -> "np.ndarray":
+    """Chiffre un tableau d'indices de lettres (0..25) depuis l'état courant de la
+    machine, sans le modifier. Renvoie un tableau uint8 d'indices."""
+    _exiger_numpy()
+    lettres = np.asarray(lettres, dtype=np.uint8)
+    out = np.empty(len(lettres), dtype=np.uint8)
+    if len(lettres) == 0:
+        return out
+
+    positions = [r.position for r in machine.rotors]
+    crans = [r.notch_idx for r in machine.rotors]
+    progs = frappes_pas(positions, crans)
+    tables = [_tables_np(r.wiring, r.ring_setting) for r in machine.rotors]
+    plug = np.array(machine.plugboard.table, dtype=np.uint8)
+    refl = np.array(machine.reflector.table, dtype=np.uint8)
+
+    for k0 in range(0, len(lettres), TAILLE_BLOC):
+        bloc = lettres[k0:k0 + TAILLE_BLOC].astype(np.int64)
+        out[k0:k0 + len(bloc)] = _chiffrer_bloc(bloc, k0, positions, crans, progs, tables, plug, refl)
+    return out
+
+
+def nettoyer_octets(text: str, keep_spaces: bool) -> bytes:
+    """Même nettoyage que MachineEnigma.encrypt, sous forme d'octets ASCII."""
+    brut = text.upper().encode("ascii", "ignore")
+    return brut.translate(None, _NON_LETTRES_ESPACES if keep_spaces else _NON_LETTRES)
+
+
+def chiffrer_octets(machine, clean: bytes) -> bytes:
+    """Chiffre des octets déjà nettoyés (A–Z et espaces). Les espaces passent tels
+    quels et ne font pas tourner les rotors. Ne modifie pas la machine."""
+    _exiger_numpy()
+    arr = np.frombuffer(clean, dtype=np.uint8)
+    masque = arr != 32
+    if masque.all():
+        return (chiffrer_indices(machine, arr - 65) + 65).tobytes()
+    out = arr.copy()
+    out[masque] = chiffrer_indices(machine, arr[masque] - 65) + 65
+    return out.tobytes()
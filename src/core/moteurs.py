@@ -0,0 +1,191 @@
+"""Moteurs de chiffrement interchangeables derrière MachineEnigma.encrypt.
+
+Un moteur reçoit la machine et le texte déjà nettoyé (A–Z, et espaces si
+keep_spaces) ; il renvoie le texte chiffré et laisse la machine dans le même
+état qu'après la boucle de référence. Trois moteurs :
+- "reference" : la boucle d'origine, encrypt_char caractère par caractère ;
+- "tables"    : Python pur, sans test de cran à chaque frappe : les frappes où
+                les rotors lents bougent sont connues d'avance (core.stepping),
+                le reste n'est que lectures de tables ;
+- "numpy"     : le moteur vectorisé (core.moteur_numpy), si NumPy est installé.
+
+Sans choix explicite, le moteur dépend de la longueur du texte (voir SEUILS) ;
+`calibrer()` mesure les points de bascule sur la machine courante.
+
+NumPy n'est importé qu'au premier texte assez long pour le moteur "numpy"
+(ou au premier choix explicite) : les messages courts n'en paient pas le coût.
+"""
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Set, Tuple
+
+from core.rotors import _compiler_tables
+from core.stepping import frappes_pas
+from configuration.configuration import ALPHABET
+
+# Longueur (caractères nettoyés) à partir de laquelle chaque moteur devient le plus rapide.
+# Valeurs mesurées avec calibrer() ; à ajuster par hôte si besoin.
+SEUILS: Dict[str, int] = {
+    "tables": 32,
+    "numpy": 2000,
+}
+
+
+def chiffrer_reference(machine, clean: str) -> str:
+    """Boucle de référence : une frappe = _step_rotors + trajet complet."""
+    out = []
+    for ch in clean:
+        if ch == " ":
+            out.append(" ")  # n'affecte pas les rotors, pour m'aider à la lisibilité...
+            continue
+        out.append(machine.encrypt_char(ch))
+    return "".join(out)
+
+
+def _frappes_lentes(positions: List[int], crans: List[int], nb: int) -> Dict[int, Set[int]]:
+    """Frappes (1..nb) où au moins un rotor autre que le rapide avance,
+    avec l'ensemble des rotors (index) qui avancent à cette frappe."""
+    frappes: Dict[int, Set[int]] = {}
+    for j, progs in enumerate(frappes_pas(positions, crans)[:-1]):
+        for initiaux, premier, periode in progs:
+            for k in [x for x in initiaux if x <= nb] + list(range(premier, nb + 1, periode)):
+                frappes.setdefault(k, set()).add(j)
+    return frappes
+
+
+@lru_cache(maxsize=256)
+def _tables_rapide(wiring: str, ring_setting: int, plug: Tuple[int, ...]):
+    """Tables du rotor rapide avec le plugboard fondu dedans :
+    entree[position][lettre] -> index, sortie[position][index] -> lettre."""
+    forward, reverse = _compiler_tables(wiring, ring_setting)
+    entree = [[fwd[plug[x]] for x in range(26)] for fwd in forward]
+    sortie = [[ALPHABET[plug[y]] for y in rev] for rev in reverse]
+    return entree, sortie
+
+
+def chiffrer_tables(machine, clean: str) -> str:
+    """Moteur Python pur piloté par tables : le plugboard est fondu dans les tables
+    du rotor rapide, la partie lente est recomposée seulement quand elle bouge."""
+    rotors = machine.rotors
+    rapide = rotors[-1]
+    plug = machine.plugboard.table
+    entree, sortie = _tables_rapide(rapide.wiring, rapide.ring_setting, plug)
+
+    nb = len(clean) - clean.count(" ")
+    pas = _frappes_lentes([r.position for r in rotors], machine._crans, nb)
+    evenements = iter(sorted(pas))
+    prochain = next(evenements, 0)
+
+    interne = machine._interne
+    if interne is None:
+        interne = machine._interne = machine._composer_interne()
+
+    p = rapide.position
+    k = 0
+    out = []
+    for ch in clean:
+        if ch == " ":
+            out.append(" ")
+            continue
+        k += 1
+        p = p + 1 if p < 25 else 0
+        if k == prochain:
+            for j in pas[k]:
+                rotors[j].step()
+            interne = machine._interne = machine._composer_interne()
+            prochain = next(evenements, 0)
+        out.append(sortie[p][interne[entree[p][ord(ch) - 65]]])
+
+    rapide.position = p
+    return "".join(out)
+
+
+def numpy_disponible() -> bool:
+    """Vrai si le moteur "numpy" est utilisable (importe NumPy au premier appel)."""
+    from core.moteur_numpy import numpy_disponible
+
+    return numpy_disponible()
+
+
+def chiffrer_numpy(machine, clean: str) -> str:
+    """Moteur vectorisé (nécessite NumPy)."""
+    from core.moteur_numpy import chiffrer_octets
+
+    octets = clean.encode("ascii")
+    out = chiffrer_octets(machine, octets).decode("ascii")
+    machine.advance(len(octets) - octets.count(b" "))
+    return out
+
+
+MOTEURS: Dict[str, Callable] = {
+    "reference": chiffrer_reference,
+    "tables": chiffrer_tables,
+    "numpy": chiffrer_numpy,
+}
+
+
+def moteurs_disponibles() -> List[str]:
+    """Noms des moteurs utilisables sur cet hôte."""
+    return [nom for nom in MOTEURS if nom != "numpy" or numpy_disponible()]
+
+
+def choisir_moteur(longueur: int, nom: str | None = None) -> Callable:
+    """Moteur explicite (`nom`) ou choisi selon la longueur du texte nettoyé."""
+    if nom is not None:
+        if nom not in MOTEURS:
+            raise ValueError(f"Moteur inconnu: {nom!r}. Choisir parmi: {', '.join(MOTEURS)}")
+        if nom == "numpy" and not numpy_disponible():
+            raise ImportError("NumPy est requis pour le moteur 'numpy' (pip install numpy).")
+        return MOTEURS[nom]
+    if longueur >= SEUILS["numpy"] and numpy_disponible():
+        return chiffrer_numpy
+    if longueur >= SEUILS["tables"]:
+        return chiffrer_tables
+    return chiffrer_reference
+
+
+def _mesurer(moteur: Callable, creer_machine: Callable, clean: str, repetitions: int) -> float:
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        machine = creer_machine()
+        debut = time.perf_counter()
+        moteur(machine, clean)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def calibrer(creer_machine: Callable, tailles: List[int] | None = None, repetitions: int = 5) -> Dict:
+    """Mesure chaque moteur disponible sur des textes de tailles croissantes.
+    Renvoie {"mesures": {taille: {moteur: secondes}}, "seuils": {moteur: taille}},
+    où seuils donne, pour chaque moteur, la plus petite taille à partir de laquelle
+    il est le plus rapide (directement utilisable dans SEUILS)."""
+    if tailles is None:
+        tailles = [1, 4, 16, 40, 100, 300, 1000, 3000, 10000, 30000, 100000]
+    noms = moteurs_disponibles()
+    mesures: Dict[int, Dict[str, float]] = {}
+    for taille in tailles:
+        clean = (ALPHABET * (taille // 26 + 1))[:taille]
+        reps = repetitions if taille < 10000 else max(1, repetitions // 2)
+        mesures[taille] = {nom: _mesurer(MOTEURS[nom], creer_machine, clean, reps) for nom in noms}
+
+    seuils: Dict[str, int] = {}
+    for nom in noms:
+        if nom == "reference":
+            continue
+        for taille in tailles:
+            if min(mesures[taille], key=mesures[taille].get) == nom:
+                seuils[nom] = taille
+                break
+    return {"mesures": mesures, "seuils": seuils}
+
+
+def formater_calibration(resultat: Dict) -> str:
+    """Tableau texte des mesures de calibrer() et des seuils suggérés."""
+    mesures = resultat["mesures"]
+    noms = list(next(iter(mesures.values())))
+    lignes = ["taille".rjust(8) + "".join(nom.rjust(14) for nom in noms)]
+    for taille, temps in mesures.items():
+        lignes.append(str(taille).rjust(8) + "".join(f"{temps[nom] * 1e6:12.1f}us" for nom in noms))
+    seuils = ", ".join(f"{nom} >= {taille}" for nom, taille in resultat["seuils"].items())
+    lignes.append(f"Seuils suggérés : {seuils or 'reference partout'}")
+    return "\n".join(lignes)
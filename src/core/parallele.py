@@ -0,0 +1,77 @@
+"""Chiffrement multi-processus des très longs textes.
+
+Le texte nettoyé est découpé en morceaux ; chaque worker place sa copie de la
+machine au bon numéro de frappe (MachineEnigma.advance, en O(nombre de rotors))
+puis chiffre son morceau. Les espaces ne font pas tourner les rotors : le
+décalage d'un morceau est donc le nombre de lettres qui le précèdent.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from core.machineEnigma import MachineEnigma, nettoyer_texte
+from utils.formatage import group5
+
+# En dessous de cette taille (caractères nettoyés), lancer des processus coûte plus cher que ça ne rapporte
+TAILLE_MIN_PARALLELE = 200_000
+
+# Morceaux par worker : un peu plus d'un pour lisser les écarts de vitesse
+MORCEAUX_PAR_WORKER = 4
+
+# État propre à chaque processus worker
+_machine: MachineEnigma | None = None
+_etat_depart = 0
+
+
+def _init_worker(machine: MachineEnigma) -> None:
+    global _machine, _etat_depart
+    _machine = machine
+    _etat_depart = machine.get_state()
+
+
+def _chiffrer_morceau(tache: Tuple[int, str]) -> str:
+    decalage, morceau = tache
+    _machine.set_state(_etat_depart)
+    _machine.advance(decalage)
+    return _machine.encrypt(morceau, keep_spaces=True)
+
+
+def decouper(clean: str, nb_morceaux: int) -> List[Tuple[int, str]]:
+    """Découpe le texte nettoyé en (nombre de lettres avant le morceau, morceau)."""
+    taille = max(1, -(-len(clean) // nb_morceaux))
+    taches = []
+    lettres = 0
+    for i in range(0, len(clean), taille):
+        morceau = clean[i:i + taille]
+        taches.append((lettres, morceau))
+        lettres += len(morceau) - morceau.count(" ")
+    return taches
+
+
+def encrypt_parallel(
+    machine: MachineEnigma,
+    text: str,
+    workers: int | None = None,
+    keep_spaces: bool = False,
+    group_5: bool = False,
+) -> str:
+    """Chiffre `text` comme machine.encrypt, réparti sur `workers` processus
+    (par défaut : tous les cœurs). La machine avance ensuite exactement comme
+    après encrypt."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers doit être >= 1.")
+
+    clean = nettoyer_texte(text, keep_spaces)
+    if workers == 1 or len(clean) < TAILLE_MIN_PARALLELE:
+        return machine.encrypt(text, keep_spaces=keep_spaces, group_5=group_5)
+
+    taches = decouper(clean, workers * MORCEAUX_PAR_WORKER)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(machine,)) as pool:
+        cipher = "".join(pool.map(_chiffrer_morceau, taches))
+
+    machine.advance(len(clean) - clean.count(" "))
+    if group_5:
+        return group5(cipher.replace(" ", ""))
+    return cipher
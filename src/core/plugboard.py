@@ -9,9 +9,21 @@ class Plugboard:
     """Classe Plugboard pour gérer les connexions du plugboard."""
     def __init__(self, paires: Iterable[str] | None = None) -> None:
         self.plugboard : Dict[str, str] = {}
+        # Permutation compilée (index -> index), recalculée à chaque modification des connexions
+        self.table: Tuple[int, ...] = tuple(range(26))
         if paires:
             self.configurer(paires)
 
+    def copie(self) -> "Plugboard":
+        """Copie indépendante des connexions, sans revalidation."""
+        double = Plugboard.__new__(Plugboard)
+        double.plugboard = dict(self.plugboard)
+        double.table = self.table
+        return double
+
+    def _compiler(self) -> None:
+        self.table = tuple(ALPHABET.index(self.plugboard.get(c, c)) for c in ALPHABET)
+
 
     def configurer(self, paires: Iterable[str]) -> None:
         """List(str) paires: Liste de paires de lettres à connecter."""
@@ -34,6 +46,7 @@ class Plugboard:
             lettres_utilisees.update({a, b})
             self.plugboard[a] = b
             self.plugboard[b] = a
+        self._compiler()
 
     
     def est_connectee(self, lettre: str) -> bool:
@@ -54,6 +67,10 @@ class Plugboard:
         if not est_majuscule(L):
             return lettre
         return self.plugboard.get(L, L)
+
+    def permuter_idx(self, idx: int) -> int:
+        """Chemin rapide : index (0..25) -> index, sans validation (faite à la configuration)."""
+        return self.table[idx]
     
     def connect(self, a: str, b: str) -> None:
         """Ajoute une connexion a<->b (lève si impossible)."""
@@ -68,6 +85,7 @@ class Plugboard:
             assertionError("Une des lettres est déjà connectée.")
         self.plugboard[a] = b
         self.plugboard[b] = a
+        self._compiler()
 
     def disconnect(self, lettre: str) -> Optional[Tuple[str, str]]:
         """Supprime la paire contenant `lettre`. Renvoie le tuple (x,y) supprimé ou None si non connectée."""
@@ -81,11 +99,13 @@ class Plugboard:
         autre = self.plugboard.pop(L)
         if self.plugboard.get(autre) == L:
             self.plugboard.pop(autre, None)
+        self._compiler()
         return tuple(sorted((L, autre)))
 
     def reset(self):
         """Réinitialise le plugboard en supprimant toutes les connexions."""
         self.plugboard.clear()
+        self._compiler()
     
 
     @property
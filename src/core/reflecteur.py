@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Tuple
 from utils import assertionError
 from configuration.configuration import REFLECTORS
 
@@ -17,6 +17,8 @@ class Reflecteur:
         else:
             self.mapping = mapping or {}
             _validate_bijection(self.mapping)
+        # Permutation compilée (index -> index) pour le trajet du signal
+        self.table: Tuple[int, ...] = _compiler_table(self.mapping)
 
     def allumer_lettre(self, lettre: str) -> str:
         """Réfléchit une lettre via le reflecteur."""
@@ -26,6 +28,10 @@ class Reflecteur:
         if L not in ALPHABET:
             return lettre
         return self.mapping.get(L, L)
+
+    def allumer_idx(self, idx: int) -> int:
+        """Chemin rapide : index (0..25) -> index, sans validation (faite à la construction)."""
+        return self.table[idx]
         
 
 def _str_to_bijective_map(s: str) -> Dict[str, str]:
@@ -44,6 +50,17 @@ def _str_to_bijective_map(s: str) -> Dict[str, str]:
     return m
 
 
+def _compiler_table(m: Dict[str, str]) -> Tuple[int, ...]:
+    """Mapping lettre -> lettre en table de 26 index (lettres non mappées : identité)."""
+    table = []
+    for a in ALPHABET:
+        b = m.get(a, a)
+        if len(b) != 1 or b not in ALPHABET:
+            assertionError(f"Le réflecteur doit renvoyer une lettre A–Z: {a!r} -> {b!r}.")
+        table.append(ALPHABET.index(b))
+    return tuple(table)
+
+
 def _validate_bijection(m: Dict[str, str]) -> None:
     if not m:
         return
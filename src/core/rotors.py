@@ -1,15 +1,47 @@
 from configuration.configuration import ROTORS
 from utils.nettoyage import assertionError
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Tuple
 
 ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 A_IDX = {c: i for i, c in enumerate(ALPHABET)}
 
+Table = Tuple[int, ...]
+
 
 def _mod26(x: int) -> int:
     return x % 26
 
-@dataclass
+
+@lru_cache(maxsize=None)
+def _compiler_cablage(wiring: str) -> Tuple[bytes, bytes]:
+    """Câblage sous forme d'index (entrée -> sortie, et sa réciproque), en bytes,
+    partagé entre tous les rotors de même câblage."""
+    forward = bytes(A_IDX[c] for c in wiring)
+    reverse = bytearray(26)
+    for i, out_idx in enumerate(forward):
+        reverse[out_idx] = i
+    return forward, bytes(reverse)
+
+
+@lru_cache(maxsize=None)
+def _compiler_tables(wiring: str, ring_setting: int) -> Tuple[Tuple[Table, ...], Tuple[Table, ...]]:
+    """Compile, pour chacune des 26 positions, la substitution aller et retour
+    avec le ring setting déjà appliqué : tables[position][entrée] -> sortie.
+    Les tables ne dépendent que du câblage et du ring, elles sont donc partagées
+    entre tous les rotors identiques."""
+    forward, reverse = _compiler_cablage(wiring)
+
+    tables_forward = []
+    tables_reverse = []
+    for position in range(26):
+        decalage = position - ring_setting
+        tables_forward.append(tuple(_mod26(forward[_mod26(i + decalage)] - decalage) for i in range(26)))
+        tables_reverse.append(tuple(_mod26(reverse[_mod26(i + decalage)] - decalage) for i in range(26)))
+    return tuple(tables_forward), tuple(tables_reverse)
+
+@dataclass(slots=True)
 class Rotor:
     name: str
     wiring: str         # 26 lettres e.g. "EKMFLGDQVZNTOWYHXUSPAIBRCJ"
@@ -17,28 +49,46 @@ class Rotor:
     position: int = 0   # 0..25 (A=0, B=1, ...)
     ring_setting: int = 0  # 0..25 (Ringstellung ; A=0)
 
+    # Calculés dans __post_init__ ; le câblage et les tables sont partagés entre
+    # rotors identiques, une instance ne porte que ses références et sa position
+    notch_idx: int = field(init=False, repr=False, compare=False)
+    forward: bytes = field(init=False, repr=False, compare=False)
+    reverse: bytes = field(init=False, repr=False, compare=False)
+    tables_forward: Tuple[Table, ...] = field(init=False, repr=False, compare=False)
+    tables_reverse: Tuple[Table, ...] = field(init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
-        self.wiring = self.wiring.upper()
+        if not self.wiring.isupper():
+            self.wiring = self.wiring.upper()
         if len(self.wiring) != 26:
             assertionError("Le wiring du rotor doit comporter 26 lettres.")
         self.notch = self.notch.upper()
         if len(self.notch) != 1 or self.notch not in ALPHABET:
             assertionError("Le notch doit être une lettre A–Z.")
+        self.notch_idx = A_IDX[self.notch]
         self.position = _mod26(self.position)
         self.ring_setting = _mod26(self.ring_setting)
 
-        # Pré-calcul des mappings indexés
-        self.forward = [A_IDX[c] for c in self.wiring]                 # entrée -> sortie (index)
-        # reverse: pour chaque sortie, où est l'entrée
-        self.reverse = [0] * 26
-        for i, out_idx in enumerate(self.forward):
-            self.reverse[out_idx] = i
+        # Mappings indexés : forward[entrée] -> sortie, reverse[sortie] -> entrée
+        self.forward, self.reverse = _compiler_cablage(self.wiring)
+
+        # Tables par position (ring inclus) : le trajet du signal devient une simple lecture
+        self.tables_forward, self.tables_reverse = _compiler_tables(self.wiring, self.ring_setting)
+
+    def copie(self) -> "Rotor":
+        """Copie sans revalidation (câblage et tables partagés, position indépendante)."""
+        double = object.__new__(Rotor)
+        double.name, double.wiring, double.notch = self.name, self.wiring, self.notch
+        double.position, double.ring_setting, double.notch_idx = self.position, self.ring_setting, self.notch_idx
+        double.forward, double.reverse = self.forward, self.reverse
+        double.tables_forward, double.tables_reverse = self.tables_forward, self.tables_reverse
+        return double
 
     # --- mécanique ---
     @property
     def at_notch(self) -> bool:
         """Vrai si le rotor est sur sa/son (ses) cran(s)."""
-        return self.position == A_IDX[self.notch]
+        return self.position == self.notch_idx
 
     def step(self) -> None:
         """Fait tourner le rotor d'une position (A->B)."""
@@ -47,19 +97,11 @@ class Rotor:
     # --- signal ---
     def map_forward(self, idx: int) -> int:
         """Passage aller (gauche <- droite) avec offset de position et ring setting."""
-        # appliquer le décalage (position - ring)
-        shifted = _mod26(idx + self.position - self.ring_setting)
-        wired = self.forward[shifted]
-        # revenir au repère original
-        out = _mod26(wired - self.position + self.ring_setting)
-        return out
+        return self.tables_forward[self.position][idx]
 
     def map_reverse(self, idx: int) -> int:
         """Passage retour (droite -> gauche)."""
-        shifted = _mod26(idx + self.position - self.ring_setting)
-        wired = self.reverse[shifted]
-        out = _mod26(wired - self.position + self.ring_setting)
-        return out
+        return self.tables_reverse[self.position][idx]
 
 
 def create_rotor(name: str, position: str = "A", ring_setting: int = 0) -> Rotor:
@@ -0,0 +1,126 @@
+"""Forme fermée du stepping de MachineEnigma._step_rotors.
+
+Règle rappelée (voir MachineEnigma._step_rotors) : à chaque frappe le rotor
+le plus à droite avance, tout rotor sur son cran avance, et le rotor à gauche
+d'un rotor sur son cran avance aussi.
+
+Conséquence : un rotor j (hors le plus à droite) avance à la frappe t+1 si, juste
+avant cette frappe (instant t = nombre de frappes déjà faites), le rotor j ou
+le rotor j+1 est sur son cran. Il suffit donc de connaître, pour chaque rotor,
+l'ensemble des instants où il est sur son cran. Ces ensembles sont
+"quelques instants initiaux + une progression arithmétique", de période
+26 pour le rotor rapide puis 25 fois plus longue à chaque rotor vers la gauche.
+Tout se calcule en O(nombre de rotors), quel que soit le nombre de frappes.
+"""
+from typing import Iterator, List, Sequence, Tuple
+
+# (instants initiaux, premier instant de la progression, période)
+# Les instants initiaux sont tous strictement inférieurs au premier.
+Progression = Tuple[Tuple[int, ...], int, int]
+
+
+def _iterer(prog: Progression) -> Iterator[int]:
+    initiaux, premier, periode = prog
+    yield from initiaux
+    k = premier
+    while True:
+        yield k
+        k += periode
+
+
+def _decaler(prog: Progression, d: int) -> Progression:
+    initiaux, premier, periode = prog
+    return tuple(x + d for x in initiaux), premier + d, periode
+
+
+def compter(prog: Progression, borne: int) -> int:
+    """Nombre d'éléments de la progression strictement inférieurs à borne."""
+    initiaux, premier, periode = prog
+    n = sum(1 for x in initiaux if x < borne)
+    if borne > premier:
+        n += (borne - 1 - premier) // periode + 1
+    return n
+
+
+def _instants_cran(position: int, cran: int, poussees: Progression) -> Progression:
+    """Instants où un rotor (hors rotor rapide) est sur son cran, sachant qu'il est
+    poussé par son voisin de droite aux frappes `poussees`.
+
+    Un rotor sur son cran avance à la frappe suivante (auto-pas) ; si une poussée
+    tombe sur la même frappe, il n'avance qu'une fois. Une fois les instants
+    initiaux passés, chaque tour complet coûte 25 poussées : période 25 * période
+    des poussées."""
+    regime = poussees[1]
+    instants: List[int] = []
+    auto = None  # frappe de l'auto-pas en attente
+    if position == cran:
+        instants.append(0)
+        auto = 1
+
+    it = _iterer(poussees)
+    prochaine = next(it)
+    while True:
+        if auto is not None and auto <= prochaine:
+            k, auto = auto, None
+            if prochaine == k:
+                prochaine = next(it)
+        else:
+            k = prochaine
+            prochaine = next(it)
+        position = (position + 1) % 26
+        if position == cran:
+            instants.append(k)
+            auto = k + 1
+            if k >= regime:
+                break
+    return tuple(instants[:-1]), instants[-1], 25 * poussees[2]
+
+
+def instants_cran(positions: Sequence[int], crans: Sequence[int]) -> List[Progression]:
+    """Pour chaque rotor (gauche -> droite), les instants où il est sur son cran."""
+    n = len(positions)
+    res: List[Progression] = [((), 0, 1)] * n
+    res[-1] = ((), (crans[-1] - positions[-1]) % 26, 26)
+    for j in range(n - 2, -1, -1):
+        res[j] = _instants_cran(positions[j], crans[j], _decaler(res[j + 1], 1))
+    return res
+
+
+def frappes_pas(positions: Sequence[int], crans: Sequence[int]) -> List[Tuple[Progression, ...]]:
+    """Pour chaque rotor, les progressions des frappes (numérotées à partir de 1)
+    où il avance. Le rotor rapide avance à chaque frappe : ((), 1, 1).
+    Pour les autres, c'est l'union (disjointe sauf à la frappe 1, voir
+    doublon_initial) de son propre cran et du cran de son voisin de droite."""
+    crans_inst = instants_cran(positions, crans)
+    n = len(positions)
+    res = []
+    for j in range(n - 1):
+        res.append((_decaler(crans_inst[j], 1), _decaler(crans_inst[j + 1], 1)))
+    res.append((((), 1, 1),))
+    return res
+
+
+def doublon_initial(positions: Sequence[int], crans: Sequence[int], j: int) -> bool:
+    """Vrai si le rotor j et son voisin de droite sont tous deux sur leur cran au
+    départ : la frappe 1 figure alors dans les deux progressions de frappes_pas,
+    mais le rotor n'avance qu'une fois."""
+    return positions[j] == crans[j] and positions[j + 1] == crans[j + 1]
+
+
+def nb_pas(positions: Sequence[int], crans: Sequence[int], frappes: int) -> List[int]:
+    """Nombre de pas effectués par chaque rotor après `frappes` frappes."""
+    if frappes < 0:
+        raise ValueError("Le nombre de frappes doit être positif.")
+    n = len(positions)
+    res = []
+    for j, progs in enumerate(frappes_pas(positions, crans)):
+        pas = sum(compter(p, frappes + 1) for p in progs)
+        if j < n - 1 and frappes > 0 and doublon_initial(positions, crans, j):
+            pas -= 1
+        res.append(pas)
+    return res
+
+
+def positions_apres(positions: Sequence[int], crans: Sequence[int], frappes: int) -> List[int]:
+    """Positions des rotors après `frappes` frappes, sans simuler chaque frappe."""
+    return [(p + s) % 26 for p, s in zip(positions, nb_pas(positions, crans, frappes))]
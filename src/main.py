@@ -1,43 +1,110 @@
 import sys
-import os
-from datetime import date
 import argparse
-import json
 
-from configuration.configuration import load_codebook
-from components.menu import Menu
-from core.machineEnigma import MachineEnigma
+from configuration.configuration import ROTORS, load_codebook
+from configuration.livre_code import CHEMIN_LIVRE_CODE, charger_livre_code
+from core.gabarit import compiler_machine, creer_machine
+from core.moteurs import calibrer, formater_calibration
+from core import instrumentation
 
 
-def charger_config_auto(codebook_path: str):
+def charger_config_auto(codebook_path: str, reseau: str = ""):
     """Charge automatiquement la config du jour ou la dernière date disponible."""
-    with open(codebook_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    today = date.today().isoformat()
-    date_str = today if today in data else sorted(data.keys())[-1]
+    livre = charger_livre_code(codebook_path)
+    date_str = livre.date_du_jour(reseau=reseau)
 
     print(f"Configuration auto chargée pour {date_str}")
-    return load_codebook(codebook_path, date_str)
+    return livre.entree(date_str, reseau)
+
+
+def calibrer_moteurs():
+    """Affiche, pour 3 et 8 rotors, le temps de chaque moteur et les seuils de bascule."""
+    for nb in (3, 8):
+        rotors = list(ROTORS)[:nb]
+        gabarit = compiler_machine(rotors, None, ["AB", "CD", "EF"])
+        resultat = calibrer(lambda: gabarit.machine("A" * nb))
+        print(f"--- {nb} rotors ---")
+        print(formater_calibration(resultat))
+
+
+def chiffrer_messages(args, codebook_path: str):
+    """Mode --lot : tous les messages en un seul processus, statistiques sur la sortie d'erreur."""
+    from core.lot_messages import ConfigurationsLot, chiffrer_lot, formater_stats, lire_lignes
+
+    configs = ConfigurationsLot(codebook_path, args.date, args.reseau)
+    sortie = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = chiffrer_lot(lire_lignes(args.lot), sortie, configs, jsonl=args.jsonl, group_5=args.group5)
+    finally:
+        if sortie is not sys.stdout:
+            sortie.close()
+    print(formater_stats(stats), file=sys.stderr)
 
 
 def main():
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("--date", type=str, help="Date du livre de code (YYYY-MM-DD)")
+    parser.add_argument("--livre", type=str, default=CHEMIN_LIVRE_CODE,
+                        help="Livre de code à utiliser (JSON, ou base SQLite .db)")
+    parser.add_argument("--reseau", type=str, default="",
+                        help="Réseau du livre de code (base SQLite uniquement)")
     parser.add_argument("--msg", type=str, default="ENIGMA DEMO", help="Message à chiffrer")
     parser.add_argument("--group5", action="store_true", help="Afficher le résultat en groupes de 5")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Chiffrer le message sur plusieurs processus (textes très longs ; pas avec --input ni --mmap)")
+    parser.add_argument("--input", type=str, default=None,
+                        help="Fichier texte à chiffrer en flux ('-' pour l'entrée standard)")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Fichier de sortie (sortie standard par défaut)")
+    parser.add_argument("--passthrough", action="store_true",
+                        help="Avec --input : recopier ponctuation et retours à la ligne")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Avec --input/--output : fichiers projetés en mémoire (très gros fichiers)")
+    parser.add_argument("--lot", nargs="*", default=None, metavar="FICHIER",
+                        help="Chiffrer un message par ligne (fichiers, ou entrée standard si aucun) ; pas avec --input, --mmap, --workers ni --passthrough")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Avec --lot : une ligne = un objet JSON (msg, date, positions, rings, reseau)")
+    parser.add_argument("--calibrer", action="store_true",
+                        help="Mesurer les moteurs de chiffrement et afficher les points de bascule")
+    parser.add_argument("--stats", action="store_true",
+                        help="Afficher compteurs et temps (frappes, pas des rotors, construction, chiffrement) sur la sortie d'erreur")
     args, _ = parser.parse_known_args()
+    if args.mmap and (not args.input or args.input == "-" or not args.output or args.group5 or args.passthrough):
+        parser.error("--mmap demande --input et --output (fichiers), sans --group5 ni --passthrough.")
+    if args.workers and (args.input or args.mmap):
+        parser.error("--workers ne s'applique pas à --input/--mmap.")
+    if args.lot is not None and (args.input or args.mmap or args.workers or args.passthrough):
+        parser.error("--lot ne se combine pas avec --input, --mmap, --workers ni --passthrough.")
+
+    if not args.stats:
+        executer(args)
+        return
+    instrumentation.activer()
+    try:
+        executer(args)
+    finally:
+        print(instrumentation.formater(), file=sys.stderr)
+
+
+def executer(args):
+    if args.calibrer:
+        calibrer_moteurs()
+        return
 
     # chemin du livre de code
-    codebook_path = os.path.join(os.path.dirname(__file__), "data", "livre_code.json")
+    codebook_path = args.livre
+
+    if args.lot is not None:
+        chiffrer_messages(args, codebook_path)
+        return
 
     # Charger la config : soit date donnée, soit auto
     if args.date:
-        entry = load_codebook(codebook_path, args.date)
+        entry = load_codebook(codebook_path, args.date, args.reseau)
     else:
-        entry = charger_config_auto(codebook_path)
+        entry = charger_config_auto(codebook_path, args.reseau)
 
-    machine = MachineEnigma(
+    machine = creer_machine(
         rotors_names=entry["rotors"],
         positions=entry["positions"],
         ring_settings=entry.get("rings", [0] * len(entry["rotors"])),
@@ -45,15 +112,30 @@ def main():
         reflector_preset="B",
     )
 
+    if args.mmap:
+        machine.encrypt_mmap(args.input, args.output, keep_spaces=True)
+        return
+
+    if args.input:
+        src = sys.stdin if args.input == "-" else args.input
+        dst = args.output or sys.stdout
+        machine.encrypt_file(src, dst, keep_spaces=True, passthrough=args.passthrough, group_5=args.group5)
+        return
+
     msg = input("Message à chiffrer : ").strip()
     if not msg:
         print("Aucun message entré.")
         return
 
-    print(machine.encrypt(msg, keep_spaces=True, group_5=args.group5))
+    if args.workers:
+        print(machine.encrypt_parallel(msg, workers=args.workers, keep_spaces=True, group_5=args.group5))
+    else:
+        print(machine.encrypt(msg, keep_spaces=True, group_5=args.group5))
 
 if __name__ == "__main__":
     if len(sys.argv) == 1:
+        # L'interface graphique (et Tk) n'est chargée que si on la lance
+        from components.menu import Menu
         Menu.main_menu()
     else:
         main()